@@ -2,8 +2,12 @@ import sys
 import os
 import logging
 import argparse
-import json
-from datetime import datetime
+import asyncio
+import collections
+import functools
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from modules import portscan
 from modules import subdomains
 from modules.dns import DNSModule
@@ -11,9 +15,37 @@ from modules import whois
 from modules import banner
 from modules import crawler
 from modules import extractor
-from modules import extractor
 from modules import tech_detect
 from modules import validator
+from modules import resolver
+from modules import uring
+from modules import reports
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Match json.dump: indent by 2 and stringify non-str dict keys (e.g. port numbers)
+    ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+log = logging.getLogger("recon")
+
+# Results directory, fixed relative to the working directory at startup
+_RESULTS_DIR = os.path.join(os.getcwd(), "Results")
+_RESULTS_DIR_READY = False
+
+# With --ndjson, open port lists longer than this are streamed to a .ndjson sidecar file
+NDJSON_THRESHOLD = 1024
+
+# Header block of print_portscan_results; missing fields print as N/A
+PORTSCAN_HEADER = (
+    "\n[+] Port Scan Results\n\n"
+    "Target        : {target}\n"
+    "Resolved IP   : {resolved_ip}\n"
+    "Scan Type     : {scan_type}\n"
+    "Scan Time     : {scan_time}"
+)
 
 
 def setup_logging(verbose: bool = False):
@@ -38,11 +70,12 @@ def ensure_results_directory():
     Returns:
         Path to Results directory
     """
-    results_dir = os.path.join(os.getcwd(), "Results")
-    if not os.path.exists(results_dir):
-        os.makedirs(results_dir)
-        logging.debug(f"Created Results directory: {results_dir}")
-    return results_dir
+    global _RESULTS_DIR_READY
+    if not _RESULTS_DIR_READY:
+        os.makedirs(_RESULTS_DIR, exist_ok=True)
+        log.debug("Using Results directory: %s", _RESULTS_DIR)
+        _RESULTS_DIR_READY = True
+    return _RESULTS_DIR
 
 
 def generate_filename(prefix: str = "scan", extension: str = "json"):
@@ -56,17 +89,92 @@ def generate_filename(prefix: str = "scan", extension: str = "json"):
     Returns:
         Filename string
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    timestamp = time.strftime("%Y-%m-%d_%H-%M-%S", time.localtime())
     return f"{prefix}_{timestamp}.{extension}"
 
 
-def save_results(results: dict, custom_filename: str = None):
+# (epoch second, formatted string) of the last scan_time handed out
+_SCAN_TIME = (None, "")
+
+
+def _now_str() -> str:
+    """
+    Current local time as a scan_time string
+    
+    Modules finishing within the same second share one formatted value.
+    
+    Returns:
+        Timestamp string (YYYY-MM-DD HH:MM:SS)
+    """
+    global _SCAN_TIME
+    second = int(time.time())
+    if _SCAN_TIME[0] != second:
+        _SCAN_TIME = (second, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second)))
+    return _SCAN_TIME[1]
+
+
+def _err_result(key: str, target, exc) -> dict:
+    """
+    Build the standard error result for a module
+    
+    Args:
+        key: Module result key (e.g. "dns_enum")
+        target: Scan target, or None for modules without one
+        exc: Exception or error message
+        
+    Returns:
+        Results dictionary with target, error and scan_time
+    """
+    result = {"target": target} if target is not None else {}
+    result["error"] = str(exc) or type(exc).__name__
+    result["scan_time"] = _now_str()
+    return {key: result}
+
+
+def write_bytes(filepath: str, data: bytes):
+    """
+    Write a whole file with raw write(2) calls, bypassing buffered file objects
+    
+    Args:
+        filepath: Destination path (created or truncated)
+        data: File contents
+    """
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def save_open_ports_ndjson(open_ports: list, filepath: str):
+    """
+    Stream open port entries to a newline-delimited JSON file
+    
+    Args:
+        open_ports: List of open port dictionaries
+        filepath: Destination .ndjson path
+    """
+    with open(filepath, 'wb') as f:
+        for port_info in open_ports:
+            if ORJSON_AVAILABLE:
+                f.write(orjson.dumps(port_info, option=orjson.OPT_NON_STR_KEYS))
+            else:
+                import json
+                f.write(json.dumps(port_info).encode())
+            f.write(b"\n")
+
+
+def save_results(results: dict, custom_filename: str = None, ndjson: bool = False):
     """
     Save results to JSON file in Results directory
     
     Args:
         results: Scan results dictionary
         custom_filename: Custom filename if provided
+        ndjson: Move open port lists above NDJSON_THRESHOLD to a .ndjson
+                sidecar file, keeping only a count in the JSON
         
     Returns:
         Path to saved file or None
@@ -81,12 +189,27 @@ def save_results(results: dict, custom_filename: str = None):
     filepath = os.path.join(results_dir, filename)
     
     try:
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2)
-        logging.info(f"Results saved to: {filepath}")
+        # On request, large port lists go to a sidecar file; the JSON keeps a summary
+        open_ports = results.get("port_scan", {}).get("open_ports", [])
+        if ndjson and len(open_ports) > NDJSON_THRESHOLD:
+            ndjson_path = os.path.splitext(filepath)[0] + ".ndjson"
+            save_open_ports_ndjson(open_ports, ndjson_path)
+            port_summary = {k: v for k, v in results["port_scan"].items() if k != "open_ports"}
+            port_summary["open_ports_count"] = len(open_ports)
+            port_summary["open_ports_file"] = os.path.basename(ndjson_path)
+            results = {**results, "port_scan": port_summary}
+            log.info("Open ports saved to: %s", ndjson_path)
+        
+        if ORJSON_AVAILABLE:
+            write_bytes(filepath, orjson.dumps(results, option=ORJSON_OPTIONS))
+        else:
+            import json
+            with open(filepath, 'w') as f:
+                json.dump(results, f, indent=2)
+        log.info("Results saved to: %s", filepath)
         return filepath
     except Exception as e:
-        logging.error(f"Failed to save results: {e}")
+        log.error("Failed to save results: %s", e)
         return None
 
 
@@ -99,7 +222,14 @@ def print_results(results: dict, output_format: str = "text"):
         output_format: Output format ('text' or 'json')
     """
     if output_format == "json":
-        print(json.dumps(results, indent=2))
+        if ORJSON_AVAILABLE:
+            sys.stdout.flush()
+            sys.stdout.buffer.write(orjson.dumps(results, option=ORJSON_OPTIONS))
+            sys.stdout.buffer.write(b"\n")
+            sys.stdout.buffer.flush()
+        else:
+            import json
+            print(json.dumps(results, indent=2))
         return
     
     # Text format - handle different result types
@@ -157,80 +287,80 @@ def print_portscan_results(results: dict):
     """Print port scan results in text format"""
     scan_data = results.get("port_scan", {})
     
-    print("\n[+] Port Scan Results\n")
-    print(f"Target        : {scan_data.get('target', 'N/A')}")
-    print(f"Resolved IP   : {scan_data.get('resolved_ip', 'N/A')}")
-    print(f"Scan Type     : {scan_data.get('scan_type', 'N/A')}")
-    print(f"Scan Time     : {scan_data.get('scan_time', 'N/A')}")
+    out = [PORTSCAN_HEADER.format_map(collections.defaultdict(lambda: 'N/A', scan_data))]
     
     if "error" in scan_data:
-        print(f"\n[-] ERROR: {scan_data['error']}\n")
+        out.append(f"\n[-] ERROR: {scan_data['error']}\n")
+        sys.stdout.write("\n".join(out) + "\n")
         return
     
     open_ports = scan_data.get("open_ports", [])
     
     if not open_ports:
-        print(f"\n[-] No open ports found\n")
+        out.append(f"\n[-] No open ports found\n")
     else:
-        print(f"\nOpen Ports ({len(open_ports)}):")
-        print("-" * 30)
-        print(f"{'PORT':<10} {'SERVICE':<20}")
-        print("-" * 30)
-        for port_info in open_ports:
-            port = port_info.get("port")
-            service = port_info.get("service", "unknown")
-            print(f"{port:<10} {service:<20}")
-        print()
+        out.append(f"\nOpen Ports ({len(open_ports)}):")
+        out.append("-" * 30)
+        out.append(f"{'PORT':<10} {'SERVICE':<20}")
+        out.append("-" * 30)
+        out.extend(
+            f"{p.get('port'):<10} {p.get('service', 'unknown'):<20}"
+            for p in open_ports
+        )
+        out.append("")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def print_subdomain_results(results: dict):
     """Print subdomain enumeration results in text format"""
     subdomain_data = results.get("subdomain_enum", {})
     
-    print("\n[+] Subdomain Enumeration Results\n")
-    print(f"Target Domain : {subdomain_data.get('target', 'N/A')}")
-    print(f"Scan Time     : {subdomain_data.get('scan_time', 'N/A')}")
+    out = ["\n[+] Subdomain Enumeration Results\n"]
+    out.append(f"Target Domain : {subdomain_data.get('target', 'N/A')}")
+    out.append(f"Scan Time     : {subdomain_data.get('scan_time', 'N/A')}")
     
     if "error" in subdomain_data:
-        print(f"\n[-] ERROR: {subdomain_data['error']}\n")
+        out.append(f"\n[-] ERROR: {subdomain_data['error']}\n")
+        sys.stdout.write("\n".join(out) + "\n")
         return
     
     subdomains_list = subdomain_data.get("subdomains", [])
     
     if not subdomains_list:
-        print(f"\n[-] No subdomains found\n")
+        out.append(f"\n[-] No subdomains found\n")
     else:
-        print(f"\nFound {len(subdomains_list)} unique subdomains:")
-        print("-" * 50)
-        for subdomain in subdomains_list:
-            print(f"  {subdomain}")
-        print()
+        out.append(f"\nFound {len(subdomains_list)} unique subdomains:")
+        out.append("-" * 50)
+        out.extend(f"  {subdomain}" for subdomain in subdomains_list)
+        out.append("")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def print_dns_results(results: dict):
     """Print DNS enumeration results in text format"""
     dns_data = results.get("dns_enum", {})
     
-    print("\n[+] DNS Enumeration Results\n")
-    print(f"Target Domain : {dns_data.get('target', 'N/A')}")
-    print(f"Scan Time     : {dns_data.get('scan_time', 'N/A')}")
+    out = ["\n[+] DNS Enumeration Results\n"]
+    out.append(f"Target Domain : {dns_data.get('target', 'N/A')}")
+    out.append(f"Scan Time     : {dns_data.get('scan_time', 'N/A')}")
     
     if "error" in dns_data:
-        print(f"\n[-] ERROR: {dns_data['error']}\n")
+        out.append(f"\n[-] ERROR: {dns_data['error']}\n")
+        sys.stdout.write("\n".join(out) + "\n")
         return
     
     records = dns_data.get("records", {})
     
     if not records:
-        print(f"\n[-] No DNS records found\n")
+        out.append(f"\n[-] No DNS records found\n")
     else:
-        print(f"\nDNS Records:")
-        print("-" * 50)
+        out.append(f"\nDNS Records:")
+        out.append("-" * 50)
         for record_type, values in records.items():
-            print(f"\n{record_type}:")
-            for value in values:
-                print(f"  {value}")
-        print()
+            out.append(f"\n{record_type}:")
+            out.extend(f"  {value}" for value in values)
+        out.append("")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def print_whois_results(results: dict):
@@ -258,35 +388,37 @@ def print_banner_results(results: dict):
     """Print banner grabbing results in text format"""
     banner_data = results.get("banner_grab", {})
     
-    print("\n[+] Banner Grabbing Results\n")
-    print(f"Target        : {banner_data.get('target', 'N/A')}")
-    print(f"Resolved IP   : {banner_data.get('resolved_ip', 'N/A')}")
-    print(f"Scan Time     : {banner_data.get('scan_time', 'N/A')}")
+    out = ["\n[+] Banner Grabbing Results\n"]
+    out.append(f"Target        : {banner_data.get('target', 'N/A')}")
+    out.append(f"Resolved IP   : {banner_data.get('resolved_ip', 'N/A')}")
+    out.append(f"Scan Time     : {banner_data.get('scan_time', 'N/A')}")
     
     if "error" in banner_data:
-        print(f"\n[-] ERROR: {banner_data['error']}\n")
+        out.append(f"\n[-] ERROR: {banner_data['error']}\n")
+        sys.stdout.write("\n".join(out) + "\n")
         return
     
     banners_list = banner_data.get("banners", [])
     
     if not banners_list:
-        print(f"\n[-] No banners grabbed\n")
+        out.append(f"\n[-] No banners grabbed\n")
     else:
-        print(f"\nBanners Grabbed ({len(banners_list)}):")
-        print("-" * 80)
+        out.append(f"\nBanners Grabbed ({len(banners_list)}):")
+        out.append("-" * 80)
         for banner_info in banners_list:
             port = banner_info.get("port")
             service = banner_info.get("service", "Unknown")
             banner_text = banner_info.get("banner", "")
             
-            print(f"\nPort {port} - {service}")
-            print("-" * 80)
+            out.append(f"\nPort {port} - {service}")
+            out.append("-" * 80)
             # Limit banner display to first 200 chars for readability
             if len(banner_text) > 200:
-                print(f"{banner_text[:200]}...")
+                out.append(f"{banner_text[:200]}...")
             else:
-                print(banner_text)
-        print()
+                out.append(banner_text)
+        out.append("")
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def print_crawler_results(results: dict):
@@ -344,17 +476,7 @@ def print_extractor_results(results: dict):
     print()
 
 
-def parse_arguments():
-    """
-    Parse command line arguments
-    
-    Returns:
-        Parsed arguments
-    """
-    parser = argparse.ArgumentParser(
-        description="Offensive Recon Tool - Comprehensive reconnaissance framework",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+EXAMPLES = """
 Examples:
   Port Scanning:
     python main.py example.com --portscan
@@ -377,7 +499,52 @@ Examples:
   
   Multiple Modules:
     python main.py example.com --subdomains --dns --portscan
-        """
+"""
+
+
+class _ExamplesAction(argparse.Action):
+    """--examples: print usage examples and exit, like --version (no target needed)"""
+    
+    def __init__(self, option_strings, dest, **kwargs):
+        super().__init__(option_strings, dest, nargs=0, default=argparse.SUPPRESS, **kwargs)
+    
+    def __call__(self, parser, namespace, values, option_string=None):
+        sys.stdout.write(EXAMPLES.lstrip("\n"))
+        parser.exit()
+
+
+def parse_arguments():
+    """
+    Parse command line arguments
+    
+    Returns:
+        Parsed arguments
+    """
+    return _build_parser().parse_args()
+
+
+@functools.lru_cache(maxsize=None)
+def _build_parser():
+    """
+    Build the argument parser once per process
+    
+    Returns:
+        argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        description="Offensive Recon Tool - Comprehensive reconnaissance framework",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Example:\n"
+            "  python main.py example.com --subdomains --dns --portscan\n\n"
+            "Run with --examples for more usage examples."
+        )
+    )
+    
+    parser.add_argument(
+        "--examples",
+        action=_ExamplesAction,
+        help="Show usage examples and exit"
     )
     
     parser.add_argument(
@@ -470,10 +637,22 @@ Examples:
     parser.add_argument(
         "-w", "--workers",
         type=int,
-        help="Maximum concurrent threads for port scan (default: 50)",
+        help="Maximum concurrent connections for port scan (default: 50)",
         default=50
     )
     
+    parser.add_argument(
+        "--syn",
+        action="store_true",
+        help="Use a half-open SYN scan (requires root, falls back to TCP connect)"
+    )
+    
+    parser.add_argument(
+        "--io-uring",
+        action="store_true",
+        help="Run TCP connect scans through io_uring (Linux, experimental; falls back to asyncio)"
+    )
+    
     # DNS specific options
     parser.add_argument(
         "--dns-types",
@@ -495,6 +674,18 @@ Examples:
         default="text"
     )
     
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help=f"Write open ports to a .ndjson file next to the JSON results when there are more than {NDJSON_THRESHOLD}"
+    )
+    
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Write the HTML report gzip-compressed (.html.gz)"
+    )
+    
     parser.add_argument(
         "-o", "--output",
         help="Custom filename for results in Results/ folder",
@@ -507,7 +698,13 @@ Examples:
         help="Enable verbose/debug output"
     )
     
-    return parser.parse_args()
+    return parser
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_port_list(port_string: str) -> tuple:
+    """Parse a comma-separated port list; cached by the raw string"""
+    return tuple(int(p.strip()) for p in port_string.split(","))
 
 
 def parse_ports(port_string: str):
@@ -518,33 +715,45 @@ def parse_ports(port_string: str):
         port_string: Port specification (e.g., "80,443" or "1-1000")
         
     Returns:
-        List of ports or tuple (start, end) for range
+        List of ports, or a range object for a port range
     """
     if not port_string:
         return None
         
-    # If already parsed (list or tuple), return as is
-    if isinstance(port_string, (list, tuple)):
+    # If already parsed (list, tuple or range), return as is
+    if isinstance(port_string, (list, tuple, range)):
         return port_string
     
     # Check if it's a range
     if "-" in port_string:
         try:
             start, end = port_string.split("-")
-            return (int(start.strip()), int(end.strip()))
+            return range(int(start.strip()), int(end.strip()) + 1)
         except ValueError:
-            logging.error(f"Invalid port range: {port_string}")
+            log.error("Invalid port range: %s", port_string)
             sys.exit(1)
     
     # Otherwise, treat as comma-separated list
+    # (portscan and the validator still read a 2-tuple as (start, end),
+    # so hand out a list copy)
     try:
-        ports = [int(p.strip()) for p in port_string.split(",")]
-        return ports
+        return list(_parse_port_list(port_string))
     except ValueError:
-        logging.error(f"Invalid port list: {port_string}")
+        log.error("Invalid port list: %s", port_string)
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=None)
+def _has_uring() -> bool:
+    """
+    Check once whether the kernel allows io_uring (Linux only)
+    
+    Returns:
+        True if the io_uring connect backend could be used
+    """
+    return uring.available()
+
+
 def run_portscan(target: str, args) -> dict:
     """
     Run port scan module
@@ -556,15 +765,24 @@ def run_portscan(target: str, args) -> dict:
     Returns:
         Port scan results dictionary
     """
-    logging.info(f"Starting port scan: {target}")
+    log.info("Starting port scan: %s", target)
     
     config = {
         "timeout": args.timeout,
-        "max_workers": args.workers
+        "max_workers": args.workers,
+        "scan_type": "syn" if args.syn else "tcp_connect",
+        # io_uring is opt-in; the asyncio backend stays the default
+        "backend": "io_uring" if args.io_uring and _has_uring() else "asyncio"
     }
     
+    # args.ports was parsed once in main() (list or range)
     if args.ports:
-        config["ports"] = parse_ports(args.ports)
+        config["ports"] = args.ports
+    
+    # Resolve once here (shared cache) so the scanner never touches DNS
+    resolved_ip = resolver.resolve_a(target)
+    if resolved_ip:
+        config["resolved_ip"] = resolved_ip
     
     results = portscan.run(target, config)
     results["port_scan"]["target"] = target
@@ -582,7 +800,7 @@ def run_subdomain_enum(target: str) -> dict:
     Returns:
         Subdomain enumeration results dictionary
     """
-    logging.info(f"Starting subdomain enumeration: {target}")
+    log.info("Starting subdomain enumeration: %s", target)
     
     try:
         subdomains_list = subdomains.get_subdomains(target)
@@ -592,18 +810,12 @@ def run_subdomain_enum(target: str) -> dict:
                 "target": target,
                 "subdomains": subdomains_list,
                 "count": len(subdomains_list),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "scan_time": _now_str()
             }
         }
     except Exception as e:
-        logging.error(f"Subdomain enumeration failed: {e}")
-        return {
-            "subdomain_enum": {
-                "target": target,
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("Subdomain enumeration failed: %s", e)
+        return _err_result("subdomain_enum", target, e)
 
 
 def run_dns_enum(target: str, args) -> dict:
@@ -617,10 +829,11 @@ def run_dns_enum(target: str, args) -> dict:
     Returns:
         DNS enumeration results dictionary
     """
-    logging.info(f"Starting DNS enumeration: {target}")
+    log.info("Starting DNS enumeration: %s", target)
     
     try:
-        dns_module = DNSModule(nameserver=args.nameserver)
+        # Answers are shared process-wide, so repeated lookups hit the cache
+        dns_module = DNSModule(nameserver=args.nameserver, cache=resolver.CachingResolver.instance())
         
         dns_types = None
         if args.dns_types:
@@ -632,23 +845,17 @@ def run_dns_enum(target: str, args) -> dict:
             "dns_enum": {
                 "target": target,
                 "records": records,
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "scan_time": _now_str()
             }
         }
     except Exception as e:
-        logging.error(f"DNS enumeration failed: {e}")
-        return {
-            "dns_enum": {
-                "target": target,
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("DNS enumeration failed: %s", e)
+        return _err_result("dns_enum", target, e)
 
 
 def run_whois_lookup(target: str) -> dict:
     """
-    Run WHOIS lookup module using python-whois library
+    Run WHOIS lookup module over a direct TCP/43 connection
     
     Args:
         target: Target domain
@@ -656,42 +863,34 @@ def run_whois_lookup(target: str) -> dict:
     Returns:
         WHOIS lookup results dictionary
     """
-    logging.info(f"Starting WHOIS lookup: {target}")
+    return asyncio.run(run_whois_lookup_async(target))
+
+
+async def run_whois_lookup_async(target: str) -> dict:
+    """
+    Run WHOIS lookup module on the running event loop
     
-    try:
-        import whois
-        
-        # Run whois lookup
-        w = whois.whois(target)
+    Args:
+        target: Target domain
         
-        # Convert to string/dict representation
-        whois_data = str(w)
+    Returns:
+        WHOIS lookup results dictionary
+    """
+    log.info("Starting WHOIS lookup: %s", target)
+    
+    try:
+        whois_data = await whois.lookup_async(target)
         
         return {
             "whois_lookup": {
                 "target": target,
                 "whois_data": whois_data,
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
-    except ImportError:
-        logging.error("python-whois library not found. Please install it.")
-        return {
-            "whois_lookup": {
-                "target": target,
-                "error": "Missing python-whois library",
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "scan_time": _now_str()
             }
         }
     except Exception as e:
-        logging.error(f"WHOIS lookup failed: {e}")
-        return {
-            "whois_lookup": {
-                "target": target,
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("WHOIS lookup failed: %s", e)
+        return _err_result("whois_lookup", target, e)
 
 
 def run_banner_grab(target: str, args) -> dict:
@@ -705,34 +904,23 @@ def run_banner_grab(target: str, args) -> dict:
     Returns:
         Banner grabbing results dictionary
     """
-    logging.info(f"Starting banner grabbing: {target}")
+    log.info("Starting banner grabbing: %s", target)
     
     try:
         # Use ports from port scan if available, otherwise use default banner ports
-        ports = None
-        if args.ports:
-            ports = parse_ports(args.ports)
-            if isinstance(ports, tuple):
-                # Convert range to list
-                ports = list(range(ports[0], ports[1] + 1))
-        
+        # (args.ports was parsed once in main(), shared with the port scan)
         results = banner.run(
             target,
-            ports=ports,
+            ports=args.ports or None,
+            resolved_ip=resolver.resolve_a(target),
             timeout=args.timeout,
             max_workers=min(args.workers, 20)  # Limit workers for banner grabbing
         )
         
         return results
     except Exception as e:
-        logging.error(f"Banner grabbing failed: {e}")
-        return {
-            "banner_grab": {
-                "target": target,
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("Banner grabbing failed: %s", e)
+        return _err_result("banner_grab", target, e)
 
 
 
@@ -745,11 +933,11 @@ def run_crawler(target: str, use_katana: bool = False) -> dict:
     # Check if Katana is available if requested
     if use_katana:
         if not crawler.check_katana():
-            logging.warning("Katana binary not found. Falling back to Standard Python Crawler.")
+            log.warning("Katana binary not found. Falling back to Standard Python Crawler.")
             use_katana = False
             crawler_type = "Standard (Fallback)"
 
-    logging.info(f"Starting crawler: {target} (Type: {crawler_type})")
+    log.info("Starting crawler: %s (Type: %s)", target, crawler_type)
     
     try:
         if use_katana:
@@ -757,7 +945,7 @@ def run_crawler(target: str, use_katana: bool = False) -> dict:
             # If Katana returns empty but no error, it might be due to blocking/issues. Fallback?
             # For now, trust Katana output or lack thereof.
             if not urls:
-                 logging.warning("Katana found no URLs. Trying Standard Crawler as backup...")
+                 log.warning("Katana found no URLs. Trying Standard Crawler as backup...")
                  urls = crawler.crawl(target)
                  crawler_type += " + Standard Backup"
         else:
@@ -768,25 +956,19 @@ def run_crawler(target: str, use_katana: bool = False) -> dict:
                 "target": target,
                 "urls": urls,
                 "type": crawler_type,
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "scan_time": _now_str()
             }
         }
     except Exception as e:
-        logging.error(f"Crawler failed: {e}")
-        return {
-            "crawler": {
-                "target": target,
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("Crawler failed: %s", e)
+        return _err_result("crawler", target, e)
 
 
 def run_extractor(urls: list) -> dict:
     """
     Run extractor module
     """
-    logging.info(f"Starting extractor on {len(urls)} URLs")
+    log.info("Starting extractor on %s URLs", len(urls))
     
     try:
         data = extractor.extract(urls)
@@ -795,24 +977,19 @@ def run_extractor(urls: list) -> dict:
             "extractor": {
                 "js_files": data.get("js_files", []),
                 "parameters": data.get("parameters", []),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "scan_time": _now_str()
             }
         }
     except Exception as e:
-        logging.error(f"Extractor failed: {e}")
-        return {
-            "extractor": {
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("Extractor failed: %s", e)
+        return _err_result("extractor", None, e)
 
 
 def run_tech_detection(target: str, verbose: bool = False) -> dict:
     """
     Run technology detection module
     """
-    logging.info(f"Starting technology detection: {target}")
+    log.info("Starting technology detection: %s", target)
     
     try:
         detector = tech_detect.TechnologyDetector(target, verbose=verbose)
@@ -822,18 +999,72 @@ def run_tech_detection(target: str, verbose: bool = False) -> dict:
             "tech_detect": {
                 "target": target,
                 "technologies": tech_results,
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "scan_time": _now_str()
             }
         }
     except Exception as e:
-        logging.error(f"Technology detection failed: {e}")
-        return {
-            "tech_detect": {
-                "target": target,
-                "error": str(e),
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-        }
+        log.error("Technology detection failed: %s", e)
+        return _err_result("tech_detect", target, e)
+
+
+# Module table: (CLI flag / module name, result key, runner(target, args)).
+# Order is the run and print order; the extractor has no runner because it
+# consumes the crawler's URLs and is handled in main().
+MODULES = [
+    ("portscan", "port_scan", lambda t, a: run_portscan(t, a)),
+    ("subdomains", "subdomain_enum", lambda t, a: run_subdomain_enum(t)),
+    ("dns", "dns_enum", lambda t, a: run_dns_enum(t, a)),
+    ("whois", "whois_lookup", lambda t, a: run_whois_lookup(t)),
+    ("banner", "banner_grab", lambda t, a: run_banner_grab(t, a)),
+    # Default to Katana unless python-crawler is requested
+    ("crawler", "crawler", lambda t, a: run_crawler(t, use_katana=not a.python_crawler)),
+    ("tech_detect", "tech_detect", lambda t, a: run_tech_detection(t, a.verbose)),
+    ("extractor", "extractor", None),
+]
+
+# Modules with a native coroutine runner; the others run in worker threads
+ASYNC_RUNNERS = {
+    "whois": lambda t, a: run_whois_lookup_async(t),
+}
+
+
+async def _run_modules(modules: list, args, executor: ThreadPoolExecutor, results: dict):
+    """
+    Run modules concurrently on one event loop
+    
+    Args:
+        modules: List of (module name, runner) pairs
+        args: Parsed command line arguments
+        executor: Thread pool the synchronous runners are submitted to
+        results: Dict filled with module name -> results dictionary (or the
+                 exception it raised) as each module finishes, so an
+                 interrupted run still has whatever already completed
+    """
+    loop = asyncio.get_running_loop()
+    tasks = {}
+    for module_name, runner in modules:
+        if module_name in ASYNC_RUNNERS:
+            task = ASYNC_RUNNERS[module_name](args.target, args)
+        else:
+            # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+            task = loop.run_in_executor(executor, runner, args.target, args)
+        tasks[asyncio.ensure_future(task)] = module_name
+    
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            error = task.exception()
+            results[tasks[task]] = error if error is not None else task.result()
+
+
+def _stop_modules(executor: ThreadPoolExecutor):
+    """Drop queued module runs and stop waiting for the ones in progress"""
+    try:
+        executor.shutdown(wait=False, cancel_futures=True)
+    except TypeError:
+        # cancel_futures is Python 3.9+
+        executor.shutdown(wait=False)
 
 
 def main():
@@ -843,7 +1074,7 @@ def main():
     """
     args = parse_arguments()
     
-    # Pre-process ports for validation
+    # Parse ports once; validation, port scan and banner grabbing all use this
     if args.ports:
         args.ports = parse_ports(args.ports)
     
@@ -854,106 +1085,79 @@ def main():
         print(f"[!] Input Error: {validation.get('error', 'Unknown Error')}")
         sys.exit(1)
 
-    # Sanitize output filename
-    if args.output:
-        args.output = validator.sanitize_filename(args.output)
-
     
     # Setup logging
     setup_logging(args.verbose)
     
     # Determine which modules to run
     run_all = args.all
-    modules_to_run = []
-    
-    if run_all or args.portscan:
-        modules_to_run.append("portscan")
-    if run_all or args.subdomains:
-        modules_to_run.append("subdomains")
-    if run_all or args.dns:
-        modules_to_run.append("dns")
-    if run_all or args.whois:
-        modules_to_run.append("whois")
-    if run_all or args.banner:
-        modules_to_run.append("banner")
-    if run_all or args.crawler:
-        modules_to_run.append("crawler")
-    if run_all or args.tech_detect:
-        modules_to_run.append("tech_detect")
-    if run_all or args.extractor:
-        modules_to_run.append("extractor")
+    selected = [m for m in MODULES if run_all or getattr(args, m[0])]
     
     # If no modules specified, default to port scan (backward compatibility)
-    if not modules_to_run:
-        modules_to_run.append("portscan")
+    if not selected:
+        selected = [MODULES[0]]
+    modules_to_run = [name for name, _, _ in selected]
     
-    logging.info(f"Target: {args.target}")
-    logging.info(f"Modules to run: {', '.join(modules_to_run)}")
+    log.info("Target: %s", args.target)
+    log.info("Modules to run: %s", ', '.join(modules_to_run))
     
-    # Run modules and collect results
-    all_results = {}
+    # Run modules and collect results; one slot per selected module, in the
+    # requested order, so the saved JSON layout does not depend on timing
+    all_results = dict.fromkeys(module_key for _, module_key, _ in selected)
     # Validation logic removed
     has_error = False
+    interrupted = False
     
     try:
-        for module_name in modules_to_run:
-            try:
-                if module_name == "portscan":
-                    results = run_portscan(args.target, args)
-                    all_results.update(results)
-                    
-                elif module_name == "subdomains":
-                    results = run_subdomain_enum(args.target)
-                    all_results.update(results)
-                    
-                elif module_name == "dns":
-                    results = run_dns_enum(args.target, args)
-                    all_results.update(results)
-                    
-                elif module_name == "whois":
-                    results = run_whois_lookup(args.target)
-                    all_results.update(results)
-                    
-                elif module_name == "banner":
-                    results = run_banner_grab(args.target, args)
-                    all_results.update(results)
-
-                elif module_name == "tech_detect":
-                    results = run_tech_detection(args.target, args.verbose)
-                    all_results.update(results)
-                
-                elif module_name == "crawler":
-                    # Default to Katana unless python-crawler is requested
-                    results = run_crawler(args.target, use_katana=not args.python_crawler)
-                    all_results.update(results)
-                    
-                elif module_name == "extractor":
-                    # Extractor needs crawler results
-                    crawler_data = all_results.get("crawler", {})
-                    urls = crawler_data.get("urls", [])
-                    
-                    if not urls:
-                        logging.warning("Extractor skipped: No URLs found (did crawler run?)")
-                        results = {
-                            "extractor": {
-                                "error": "No URLs to extract from (run crawler first)",
-                                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            }
-                        }
-                    else:
-                        results = run_extractor(urls)
-                    all_results.update(results)
-                
-                # Check for errors in this module
-                for key in results:
-                    if "error" in results[key]:
-                        has_error = True
-                        
-            except KeyboardInterrupt:
-                raise
-            except Exception as e:
-                logging.error(f"Error running {module_name}: {e}")
+        # Independent modules run concurrently; the extractor consumes the
+        # crawler's URLs, so it runs once the others have finished
+        concurrent_modules = [(name, runner) for name, _, runner in selected if runner]
+        executor = ThreadPoolExecutor(max_workers=max(len(concurrent_modules), 1))
+        completed = {}
+        try:
+            asyncio.run(_run_modules(concurrent_modules, args, executor, completed))
+            executor.shutdown()
+        except KeyboardInterrupt:
+            # Keep the modules that already finished and report them
+            _stop_modules(executor)
+            interrupted = True
+            print("\n\n[-] Scan interrupted by user, saving completed modules")
+        
+        for module_name, results in completed.items():
+            if isinstance(results, BaseException):
+                log.error("Error running %s: %s", module_name, results)
                 has_error = True
+                continue
+            for key, value in results.items():
+                all_results[key] = value
+        
+        if "extractor" in modules_to_run and not interrupted:
+            # Extractor needs crawler results
+            crawler_data = all_results.get("crawler") or {}
+            urls = crawler_data.get("urls", [])
+            
+            results = None
+            if not urls:
+                log.warning("Extractor skipped: No URLs found (did crawler run?)")
+                results = _err_result(
+                    "extractor", None, "No URLs to extract from (run crawler first)"
+                )
+            else:
+                try:
+                    results = run_extractor(urls)
+                except Exception as e:
+                    log.error("Error running extractor: %s", e)
+                    has_error = True
+            if results:
+                for key, value in results.items():
+                    all_results[key] = value
+        
+        # Drop slots of modules that produced nothing
+        all_results = {key: value for key, value in all_results.items() if value is not None}
+        
+        # Check for errors in any module
+        if any("error" in value for value in all_results.values()):
+            has_error = True
         
         # Save all results to file
         if all_results:
@@ -963,41 +1167,32 @@ def main():
                 prefix = modules_to_run[0]
             
             if args.output:
-                saved_path = save_results(all_results, args.output)
+                saved_path = save_results(all_results, args.output, ndjson=args.ndjson)
             else:
                 custom_name = generate_filename(prefix=prefix)
-                saved_path = save_results(all_results, custom_name)
+                saved_path = save_results(all_results, custom_name, ndjson=args.ndjson)
             
             # Print results for each module
-            for module_name in modules_to_run:
-                module_key_map = {
-                    "portscan": "port_scan",
-                    "subdomains": "subdomain_enum",
-                    "dns": "dns_enum",
-                    "whois": "whois_lookup",
-                    "banner": "banner_grab",
-                    "crawler": "crawler",
-                    "extractor": "extractor"
-                }
-                
-                module_key = module_key_map.get(module_name)
-                if module_key and module_key in all_results:
-                    module_results = {module_key: all_results[module_key]}
-                    print_results(module_results, args.format)
+            for _, module_key, _ in selected:
+                if module_key in all_results:
+                    print_results({module_key: all_results[module_key]}, args.format)
             
             if saved_path and args.format == "text":
                 print(f"[+] All results saved to: {saved_path}\n")
             if args.format == "text" or args.format == "html":
                     try:
-                        from modules import reports
                         format_type = "text" if args.format == "text" else "html"
-                        report_file = reports.create_report(all_results, args.target, format_type)
+                        report_file = reports.create_report(all_results, args.target, format_type, compress=args.gzip)
                         print(f"[+] Additional {args.format.upper()} report generated: {report_file}")
-                    except ImportError as e:
-                        print(f"[!] Could not import report module: {e}")
                     except Exception as e:
                         print(f"[!] Error generating HTML report: {e}")
         # Exit with appropriate code
+        if interrupted:
+            # Module threads still running cannot be stopped; exit without
+            # joining them
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(130)
         if has_error:
             sys.exit(1)
         
@@ -1005,9 +1200,8 @@ def main():
         print("\n\n[-] Scan interrupted by user")
         sys.exit(130)
     except Exception as e:
-        logging.error(f"Unexpected error: {e}")
+        log.error("Unexpected error: %s", e)
         if args.verbose:
-            import traceback
             traceback.print_exc()
         sys.exit(1)
 
@@ -3,17 +3,114 @@ Banner Grabbing Module
 Service fingerprinting through banner analysis
 """
 
+import asyncio
+import re
 import socket
 import logging
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import Iterable, List, Dict, Optional
+from modules import resolver
+from modules.portscan import LINGER_RST
+
+# (banner keywords, service, (keyword, more specific service) refinements),
+# checked in order; the first rule with any keyword present wins. Keywords
+# are bytes so raw banners are matched without decoding them first.
+SERVICE_RULES = (
+    # Web servers
+    ((b'apache',), 'Apache HTTP Server', ()),
+    ((b'nginx',), 'Nginx', ()),
+    ((b'iis',), 'Microsoft IIS', ()),
+    ((b'lighttpd',), 'lighttpd', ()),
+    # SSH
+    ((b'ssh',), 'SSH Server', ((b'openssh', 'OpenSSH'),)),
+    # FTP
+    ((b'ftp',), 'FTP Server', ((b'vsftpd', 'vsftpd'), (b'proftpd', 'ProFTPD'))),
+    # Mail servers
+    ((b'smtp', b'mail'), 'Mail Server', ((b'postfix', 'Postfix'), (b'exim', 'Exim'))),
+    # Databases
+    ((b'mysql',), 'MySQL', ()),
+    ((b'postgres',), 'PostgreSQL', ()),
+    ((b'redis',), 'Redis', ()),
+    ((b'mongo',), 'MongoDB', ()),
+)
+
+
+
+def _keyword_pattern(rules) -> re.Pattern:
+    # Zero-width lookahead so overlapping keywords (ssh in openssh) are all found
+    return re.compile(b'(?=(' + b'|'.join(sorted(
+        {k for keys, _, _ in rules for k in keys}
+        | {k for _, _, variants in rules for k, _ in variants}
+    )) + b'))')
+
+
+def _port_rules(*services):
+    rules = tuple(rule for rule in SERVICE_RULES if rule[1] in services)
+    return rules, _keyword_pattern(rules)
+
+
+_KEYWORD_RE = _keyword_pattern(SERVICE_RULES)
+
+_WEB_RULES = _port_rules('Apache HTTP Server', 'Nginx', 'Microsoft IIS', 'lighttpd')
+_MAIL_RULES = _port_rules('Mail Server')
+
+# Well-known ports are first matched against only the services expected there
+PORT_KEYWORDS = MappingProxyType({
+    21: _port_rules('FTP Server'),
+    22: _port_rules('SSH Server'),
+    25: _MAIL_RULES,
+    80: _WEB_RULES,
+    110: _MAIL_RULES,
+    143: _MAIL_RULES,
+    443: _WEB_RULES,
+    465: _MAIL_RULES,
+    587: _MAIL_RULES,
+    993: _MAIL_RULES,
+    995: _MAIL_RULES,
+    3306: _port_rules('MySQL'),
+    5432: _port_rules('PostgreSQL'),
+    6379: _port_rules('Redis'),
+    8080: _WEB_RULES,
+    8443: _WEB_RULES,
+    27017: _port_rules('MongoDB'),
+})
+
+# Fallback service names by port when the banner gives nothing away
+PORT_HINTS = MappingProxyType({
+    21: 'FTP',
+    22: 'SSH',
+    25: 'SMTP',
+    80: 'HTTP',
+    110: 'POP3',
+    143: 'IMAP',
+    443: 'HTTPS',
+    3306: 'MySQL',
+    5432: 'PostgreSQL',
+    6379: 'Redis',
+    8080: 'HTTP-Proxy'
+})
 
 # Common ports for banner grabbing
 BANNER_PORTS = [21, 22, 25, 80, 110, 143, 443, 3306, 5432, 6379, 8080]
 
+# Web ports get a HEAD request as soon as they connect
+HTTP_PORTS = frozenset({80, 443, 8080, 8443})
 
-def _grab_banner(ip: str, port: int, timeout: float = 3.0) -> Optional[Dict]:
+# Services that stay silent until the client speaks: probe straight away
+CLIENT_FIRST_PROBES = {
+    6379: b"INFO\r\n",
+}
+
+# Services that normally greet first: nudge them only if no greeting came
+GREETING_PROBES = {
+    25: b"EHLO recon\r\n",
+    110: b"USER recon\r\n",
+    143: b"A1 CAPABILITY\r\n",
+}
+
+
+async def _grab_banner(ip: str, port: int, timeout: float = 3.0) -> Optional[Dict]:
     """
     Grab banner from a specific port
     
@@ -25,58 +122,63 @@ def _grab_banner(ip: str, port: int, timeout: float = 3.0) -> Optional[Dict]:
     Returns:
         Dictionary with port and banner info, or None
     """
+    loop = asyncio.get_running_loop()
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(timeout)
+    sock.setblocking(False)
+    # Send probes immediately and reset the connection on close
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RST)
+    
+    async def recv_raw():
+        data = await asyncio.wait_for(loop.sock_recv(sock, 1024), timeout)
+        return data.strip()
     
     try:
         # Connect to the port
-        result = sock.connect_ex((ip, port))
-        
-        if result != 0:
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        except OSError:
             return None
         
         logging.debug(f"Connected to {ip}:{port}, attempting banner grab")
         
-        # Try to receive banner (some services send it immediately)
-        banner = None
-        try:
-            banner = sock.recv(1024).decode('utf-8', errors='ignore').strip()
-        except socket.timeout:
-            # If no immediate banner, try sending a generic request
-            pass
+        if port in HTTP_PORTS:
+            probe = b"HEAD / HTTP/1.1\r\nHost: " + ip.encode() + b"\r\n\r\n"
+        else:
+            probe = CLIENT_FIRST_PROBES.get(port)
         
-        # If no banner received, try sending HTTP request for web servers
-        if not banner and port in [80, 443, 8080, 8443]:
+        # Try to receive banner (some services send it immediately); client-first
+        # services would only run into the timeout, so they skip the wait
+        raw = b""
+        if probe is None:
             try:
-                http_request = b"HEAD / HTTP/1.1\r\nHost: " + ip.encode() + b"\r\n\r\n"
-                sock.send(http_request)
-                banner = sock.recv(1024).decode('utf-8', errors='ignore').strip()
-            except:
-                pass
+                raw = await recv_raw()
+            except asyncio.TimeoutError:
+                # Unknown ports get no probe rather than a blind extra round trip
+                probe = GREETING_PROBES.get(port)
         
-        # If still no banner, try generic probe
-        if not banner:
+        if not raw and probe is not None:
             try:
-                sock.send(b"\r\n")
-                banner = sock.recv(1024).decode('utf-8', errors='ignore').strip()
-            except:
+                await loop.sock_sendall(sock, probe)
+                raw = await recv_raw()
+            except Exception:
                 pass
         
+        # Decode once, only for the stored banner (limit length)
+        banner = raw.decode('utf-8', errors='ignore').strip()[:500]
         if banner:
-            # Clean up banner (limit length)
-            banner = banner[:500] if len(banner) > 500 else banner
             logging.info(f"Banner grabbed from {ip}:{port}")
             
             return {
                 "port": port,
                 "banner": banner,
-                "service": _identify_service(banner, port)
+                "service": _identify_service(raw, port)
             }
         else:
             logging.debug(f"No banner received from {ip}:{port}")
             return None
             
-    except socket.timeout:
+    except asyncio.TimeoutError:
         logging.debug(f"Timeout connecting to {ip}:{port}")
         return None
     except socket.error as e:
@@ -89,77 +191,68 @@ def _grab_banner(ip: str, port: int, timeout: float = 3.0) -> Optional[Dict]:
         sock.close()
 
 
-def _identify_service(banner: str, port: int) -> str:
+async def _grab_banners(ip: str, ports: Iterable[int], timeout: float, max_workers: int, banners: List[Dict]):
+    """
+    Grab banners on one event loop with at most max_workers connections open
+    
+    Args:
+        ip: Target IP address
+        ports: Ports to grab banners from
+        timeout: Connection timeout in seconds
+        max_workers: Maximum concurrent connections
+        banners: List that grabbed banner entries are appended to
+    """
+    port_iter = iter(ports)
+    
+    async def worker():
+        # Workers share one iterator, so each port is probed exactly once
+        for port in port_iter:
+            result = await _grab_banner(ip, port, timeout)
+            if result is not None:
+                banners.append(result)
+    
+    await asyncio.gather(*(worker() for _ in range(max(max_workers, 1))))
+
+
+def _identify_service(banner: bytes, port: int) -> str:
     """
     Identify service based on banner content
     
     Args:
-        banner: Banner string
+        banner: Raw banner bytes
         port: Port number
         
     Returns:
         Identified service name
     """
-    banner_lower = banner.lower()
-    
-    # Web servers
-    if 'apache' in banner_lower:
-        return 'Apache HTTP Server'
-    elif 'nginx' in banner_lower:
-        return 'Nginx'
-    elif 'microsoft-iis' in banner_lower or 'iis' in banner_lower:
-        return 'Microsoft IIS'
-    elif 'lighttpd' in banner_lower:
-        return 'lighttpd'
-    
-    # SSH
-    elif 'ssh' in banner_lower:
-        if 'openssh' in banner_lower:
-            return 'OpenSSH'
-        return 'SSH Server'
+    banner = banner.lower()
     
-    # FTP
-    elif 'ftp' in banner_lower:
-        if 'vsftpd' in banner_lower:
-            return 'vsftpd'
-        elif 'proftpd' in banner_lower:
-            return 'ProFTPD'
-        return 'FTP Server'
-    
-    # Mail servers
-    elif 'smtp' in banner_lower or 'mail' in banner_lower:
-        if 'postfix' in banner_lower:
-            return 'Postfix'
-        elif 'exim' in banner_lower:
-            return 'Exim'
-        return 'Mail Server'
+    # Try the services expected on this port before every known keyword
+    expected = PORT_KEYWORDS.get(port)
+    if expected is not None:
+        service = _match_rules(banner, *expected)
+        if service is not None:
+            return service
     
-    # Databases
-    elif 'mysql' in banner_lower:
-        return 'MySQL'
-    elif 'postgresql' in banner_lower or 'postgres' in banner_lower:
-        return 'PostgreSQL'
-    elif 'redis' in banner_lower:
-        return 'Redis'
-    elif 'mongodb' in banner_lower or 'mongo' in banner_lower:
-        return 'MongoDB'
+    service = _match_rules(banner, SERVICE_RULES, _KEYWORD_RE)
+    if service is not None:
+        return service
     
     # Default to unknown with port hint
-    else:
-        port_hints = {
-            21: 'FTP',
-            22: 'SSH',
-            25: 'SMTP',
-            80: 'HTTP',
-            110: 'POP3',
-            143: 'IMAP',
-            443: 'HTTPS',
-            3306: 'MySQL',
-            5432: 'PostgreSQL',
-            6379: 'Redis',
-            8080: 'HTTP-Proxy'
-        }
-        return port_hints.get(port, 'Unknown')
+    return PORT_HINTS.get(port, 'Unknown')
+
+
+def _match_rules(banner: bytes, rules, pattern) -> Optional[str]:
+    # One scan collects every keyword present; rules are then checked in order
+    found = set(pattern.findall(banner))
+    if found:
+        for keywords, service, variants in rules:
+            if not found.isdisjoint(keywords):
+                for keyword, variant in variants:
+                    if keyword in found:
+                        return variant
+                return service
+    return None
 
 
 def _resolve_target(target: str) -> Optional[str]:
@@ -172,27 +265,26 @@ def _resolve_target(target: str) -> Optional[str]:
     Returns:
         IP address string or None if resolution fails
     """
-    try:
-        ip = socket.gethostbyname(target)
+    # Shared with the other modules, so a repeated host costs no lookup
+    ip = resolver.resolve_a(target)
+    if ip is None:
+        logging.error(f"Failed to resolve {target}")
+    else:
         logging.info(f"Resolved {target} to {ip}")
-        return ip
-    except socket.gaierror as e:
-        logging.error(f"Failed to resolve {target}: {e}")
-        return None
-    except Exception as e:
-        logging.error(f"Unexpected error resolving {target}: {e}")
-        return None
+    return ip
 
 
-def run(target: str, ports: Optional[List[int]] = None, timeout: float = 3.0, max_workers: int = 10) -> Dict:
+def run(target: str, ports: Optional[Iterable[int]] = None, timeout: float = 3.0, max_workers: int = 10,
+        resolved_ip: Optional[str] = None) -> Dict:
     """
     Execute banner grabbing on target
     
     Args:
         target: Domain name or IP address
-        ports: List of ports to grab banners from (default: common ports)
+        ports: Ports to grab banners from, a list or range (default: common ports)
         timeout: Connection timeout in seconds
-        max_workers: Maximum concurrent threads
+        max_workers: Maximum concurrent connections
+        resolved_ip: IP address already resolved by the caller (skips DNS resolution)
     
     Returns:
         Dictionary containing banner grabbing results:
@@ -219,8 +311,8 @@ def run(target: str, ports: Optional[List[int]] = None, timeout: float = 3.0, ma
     if ports is None:
         ports = BANNER_PORTS
     
-    # Resolve target to IP
-    resolved_ip = _resolve_target(target)
+    # Resolve target to IP unless the caller already did
+    resolved_ip = resolved_ip or _resolve_target(target)
     
     if resolved_ip is None:
         return {
@@ -237,23 +329,8 @@ def run(target: str, ports: Optional[List[int]] = None, timeout: float = 3.0, ma
     banners = []
     
     try:
-        # Perform threaded banner grabbing
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit all banner grab tasks
-            future_to_port = {
-                executor.submit(_grab_banner, resolved_ip, port, timeout): port
-                for port in ports
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_port):
-                port = future_to_port[future]
-                try:
-                    result = future.result()
-                    if result is not None:
-                        banners.append(result)
-                except Exception as e:
-                    logging.error(f"Error grabbing banner from port {port}: {e}")
+        # Non-blocking connects and reads on one event loop
+        asyncio.run(_grab_banners(resolved_ip, ports, timeout, max_workers, banners))
         
         # Sort results by port number
         banners.sort(key=lambda x: x["port"])
@@ -269,17 +346,6 @@ def run(target: str, ports: Optional[List[int]] = None, timeout: float = 3.0, ma
             }
         }
         
-    except KeyboardInterrupt:
-        logging.warning("Banner grabbing interrupted by user")
-        return {
-            "banner_grab": {
-                "target": target,
-                "resolved_ip": resolved_ip,
-                "banners": banners,
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "error": "Scan interrupted by user"
-            }
-        }
     except Exception as e:
         logging.error(f"Unexpected error during banner grabbing: {e}")
         return {
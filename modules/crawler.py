@@ -1,14 +1,44 @@
 import requests
-from bs4 import BeautifulSoup
+import urllib3
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 from urllib.parse import urlparse, urljoin
 import logging
 import shutil
 import subprocess
+import tempfile
 import json
 import os
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Crawled pages are fetched with verify=False
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Maximum pages fetched concurrently by crawl()
+CRAWL_WORKERS = 50
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Only anchors are needed, so the parser skips building every other node
+HTML_PARSER = 'lxml' if LXML_AVAILABLE else 'html.parser'
+ONLY_LINKS = SoupStrainer('a', href=True)
+
+@functools.lru_cache(maxsize=None)
 def check_katana():
-    """Check if katana is installed and available in PATH or default Go bin. Returns path or None."""
+    """Check if katana is installed and available in PATH or default Go bin. Returns path or None (cached)."""
     path = shutil.which("katana")
     if path is not None:
         return path
@@ -32,13 +62,88 @@ def check_katana():
 
     return None
 
-def crawl(target_url, max_depth=2):
+def _fetch_page(session, url):
+    """
+    Fetch one page for the crawler.
+    
+    Args:
+        session (requests.Session): Shared session used for the request.
+        url (str): Page to fetch.
+    
+    Returns:
+        bytes: The page body, or None if the page could not be fetched.
+    """
+    try:
+        # Use tuple timeout (connect, read) and disable SSL verify
+        try:
+            response = session.get(url, timeout=(3.05, 10), verify=False)
+        except requests.exceptions.Timeout:
+            logging.warning(f"Timeout crawling {url}")
+            return None
+        except requests.exceptions.SSLError:
+            logging.warning(f"SSL Error crawling {url}")
+            return None
+        except requests.exceptions.RequestException as e:
+            logging.debug(f"Request error {url}: {e}")
+            return None
+
+        if response.status_code != 200:
+            return None
+        
+        return response.content
+                    
+    except Exception as e:
+        logging.debug(f"Error crawling {url}: {e}")
+        return None
+
+def extract_links(body, base_url):
+    """
+    Return the absolute URLs of every anchor in an HTML page.
+    
+    Args:
+        body (bytes): Raw page body.
+        base_url (str): URL the page was fetched from.
+    
+    Returns:
+        list: Linked URLs.
+    """
+    try:
+        # Pass bytes so the parser does encoding detection itself
+        soup = BeautifulSoup(body, HTML_PARSER, parse_only=ONLY_LINKS)
+        return [urljoin(base_url, link['href']) for link in soup.find_all('a', href=True)]
+    except Exception as e:
+        logging.debug(f"Error parsing {base_url}: {e}")
+        return []
+
+def _crawl_page(session, url):
+    """
+    Fetch one page and return the absolute URLs of its anchors.
+    
+    Args:
+        session (requests.Session): Shared session used for the request.
+        url (str): Page to fetch.
+    
+    Returns:
+        list: Linked URLs, or an empty list if the page could not be fetched.
+    """
+    body = _fetch_page(session, url)
+    if body is None:
+        return []
+    return extract_links(body, url)
+
+def crawl(target_url, max_depth=2, max_workers=CRAWL_WORKERS):
     """
     Crawl the target URL to find internal links.
     
+    Pages are fetched level by level: every URL at one depth is requested
+    concurrently, and each fetch thread parses its own page, so parsing
+    overlaps the remaining fetches. The links they contain form the next
+    level, taken in completion order.
+    
     Args:
         target_url (str): The starting URL.
         max_depth (int): Maximum recursion depth.
+        max_workers (int): Maximum concurrent page fetches.
     
     Returns:
         list: A list of unique internal URLs discovered.
@@ -48,64 +153,42 @@ def crawl(target_url, max_depth=2):
     if not target_url.startswith(('http://', 'https://')):
         target_url = f"https://{target_url}"
     
-    visited = set()
-    to_visit = [(target_url, 0)]
+    # Every URL ever enqueued, so each page is queued and fetched once
+    queued = {target_url}
+    to_visit = [target_url]
     internal_urls = set()
     
     domain = urlparse(target_url).netloc
+    suffix = f".{domain}"
     
-    while to_visit:
-        current_url, depth = to_visit.pop(0)
-        
-        if current_url in visited or depth > max_depth:
-            continue
-        
-        visited.add(current_url)
-        
-        try:
-            # Use tuple timeout (connect, read) and disable SSL verify
-            import urllib3
-            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
-            
-            try:
-                response = requests.get(current_url, timeout=(3.05, 10), headers=headers, verify=False)
-            except requests.exceptions.Timeout:
-                logging.warning(f"Timeout crawling {current_url}")
-                continue
-            except requests.exceptions.SSLError:
-                logging.warning(f"SSL Error crawling {current_url}")
-                continue
-            except requests.exceptions.RequestException as e:
-                logging.debug(f"Request error {current_url}: {e}")
-                continue
-
-            if response.status_code != 200:
-                continue
+    # One session per crawl so same-host pages reuse pooled keep-alive connections
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=max_workers, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as fetchers:
+        for depth in range(max_depth + 1):
+            if not to_visit:
+                break
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            frontier, to_visit = to_visit, []
+            pages = [fetchers.submit(_crawl_page, session, url) for url in frontier]
             
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                full_url = urljoin(current_url, href)
-                parsed_url = urlparse(full_url)
-                
-                # Filter for same domain (allow www variation)
-                if (parsed_url.netloc == domain or parsed_url.netloc.endswith(f".{domain}")) and parsed_url.scheme in ['http', 'https']:
-                    internal_urls.add(full_url)
+            for page in as_completed(pages):
+                for full_url in page.result():
+                    parsed_url = urlparse(full_url)
                     
-                    if full_url not in visited and depth + 1 <= max_depth:
-                        to_visit.append((full_url, depth + 1))
+                    # Filter for same domain (allow www variation)
+                    if (parsed_url.netloc == domain or parsed_url.netloc.endswith(suffix)) and parsed_url.scheme in ['http', 'https']:
+                        internal_urls.add(full_url)
                         
-        except Exception as e:
-            logging.debug(f"Error crawling {current_url}: {e}")
+                        if full_url not in queued and depth + 1 <= max_depth:
+                            queued.add(full_url)
+                            to_visit.append(full_url)
+    
+    session.close()
             
     logging.info(f"Crawler finished. Found {len(internal_urls)} internal URLs.")
     return list(internal_urls)
@@ -133,39 +216,51 @@ def crawl_with_katana(target_url, max_depth=2):
         "-u", target_url,
         "-d", str(max_depth),
         "-jc",          # Javascript crawling (headless)
-        "-silent",      # JSON output only if compatible, else plain text
-        # "-json"       # JSON output is better for parsing, let's stick to text line parsing for simplicity first or use -json
+        "-silent",      # No banner, results only
+        "-json"         # One JSON record per discovered endpoint
     ]
     
     internal_urls = set()
     domain = urlparse(target_url if target_url.startswith('http') else f"https://{target_url}").netloc
+    suffix = f".{domain}"
     
     try:
-        # Run katana and capture output
-        process = subprocess.Popen(
+        # Stream katana's output so URLs are filtered while it is still crawling.
+        # stderr goes to a temp file: a pipe read only after stdout ends could
+        # fill up and stall katana
+        with tempfile.TemporaryFile() as stderr_file, subprocess.Popen(
             cmd,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=stderr_file,
             text=True,
             encoding='utf-8',
-            errors='ignore'
-        )
-        stdout, stderr = process.communicate()
-        
-        if process.returncode != 0:
-            logging.error(f"Katana failed: {stderr}")
-            return []
-            
-        # Parse output (line by line)
-        for line in stdout.splitlines():
-            url = line.strip()
-            if not url:
-                continue
+            errors='ignore',
+            bufsize=1
+        ) as process:
+            for line in process.stdout:
+                line = line.strip()
+                if not line:
+                    continue
                 
-            # Filter logic similar to python crawler (same domain)
-            parsed_url = urlparse(url)
-            if (parsed_url.netloc == domain or parsed_url.netloc.endswith(f".{domain}")) and parsed_url.scheme in ['http', 'https']:
-                internal_urls.add(url)
+                try:
+                    record = json.loads(line)
+                    url = (record.get('request') or {}).get('endpoint') or record.get('endpoint') or record.get('url')
+                except ValueError:
+                    # Older katana builds without -json support print bare URLs
+                    url = line
+                if not url:
+                    continue
+                    
+                # Filter logic similar to python crawler (same domain)
+                parsed_url = urlparse(url)
+                if (parsed_url.netloc == domain or parsed_url.netloc.endswith(suffix)) and parsed_url.scheme in ['http', 'https']:
+                    internal_urls.add(url)
+            
+            process.wait()
+            if process.returncode != 0:
+                stderr_file.seek(0)
+                logging.error(f"Katana failed: {stderr_file.read().decode('utf-8', errors='ignore')}")
+                return []
                 
     except Exception as e:
         logging.error(f"Error running Katana: {e}")
@@ -1,47 +1,454 @@
 # dns_module.py
-from dns.resolver import Resolver, NoAnswer, NXDOMAIN, Timeout, NoNameservers
-import concurrent.futures
+# dnspython is imported where it is used, so importing this module (or
+# running the CLI without a lookup) does not load the whole dns.* tree
+from modules.resolver import CachingResolver
+import asyncio
+import atexit
+import functools
+import random
+import select
+import socket
+import ssl
+import struct
+import threading
+import time
+
+# Parse each domain into a dns.name.Name once; Name objects are immutable
+@functools.lru_cache(maxsize=1024)
+def _qname(domain):
+    import dns.name
+    return dns.name.from_text(domain)
+
+# Hand-built query wire format: fixed header (RD set, one question, one
+# additional record), encoded qname, then a per-type QTYPE/QCLASS + EDNS0 tail
+_QUERY_HEADER = struct.pack("!HHHH", 0x0100, 1, 0, 0) + struct.pack("!H", 1)
+_RDTYPES = {'A': 1, 'NS': 2, 'CNAME': 5, 'SOA': 6, 'MX': 15, 'TXT': 16, 'AAAA': 28}
+
+
+@functools.lru_cache(maxsize=1024)
+def _wire_qname(domain):
+    return _qname(domain).to_wire()
+
+
+@functools.lru_cache(maxsize=None)
+def _question_tail(rtype, payload):
+    import dns.rdatatype
+    rdtype = _RDTYPES.get(rtype) or int(dns.rdatatype.from_text(rtype))
+    # QTYPE, QCLASS=IN, then an OPT RR: root owner, type 41, class = UDP payload
+    return struct.pack("!HH", rdtype, 1) + b"\x00" + struct.pack("!HHIH", 41, payload, 0, 0)
+
 
 class DNSModule:
     DEFAULT_TYPES = ['A', 'AAAA', 'MX', 'NS', 'TXT', 'SOA', 'CNAME']
+    CACHE_SIZE = 1024
+    MAX_TTL = 600
+    NEGATIVE_TTL = 30
+    TCP_IDLE_TIMEOUT = 30
+    # Queries kept in flight on one socket before waiting for replies
+    BATCH_WINDOW = 256
+    # Advertised UDP payload size; large TXT/AAAA answers otherwise get truncated
+    EDNS_PAYLOAD = 4096
 
-    def __init__(self, nameserver=None):
-        self.resolver = Resolver()
+    # Event loop shared by every instance, started on first use
+    _LOOP = None
+    _LOOP_LOCK = threading.Lock()
+
+    def __init__(self, nameserver=None, tcp=False, tls=False, use_any=False, cache=None):
+        import dns.asyncresolver
+        import dns.resolver
+        self.resolver = dns.resolver.Resolver()
         if nameserver:
             self.resolver.nameservers = [nameserver]
         self.resolver.timeout = 4
         self.resolver.lifetime = 4
+        self.resolver.use_edns(0, 0, self.EDNS_PAYLOAD)
+        self.aresolver = dns.asyncresolver.Resolver()
+        self.aresolver.nameservers = self.resolver.nameservers
+        self.aresolver.timeout = self.resolver.timeout
+        self.aresolver.lifetime = self.resolver.lifetime
+        self.aresolver.use_edns(0, 0, self.EDNS_PAYLOAD)
+        # (domain, rtype) -> results; pass CachingResolver.instance() to share
+        # answers with other DNSModule instances in the same process
+        self._cache = cache if cache is not None else CachingResolver(self.CACHE_SIZE)
+        # Optional persistent TCP (or DNS-over-TLS) connection, RFC 7766 pipelining
+        self.tcp = tcp or tls
+        self.tls = tls
+        self._tcp = None
+        self._tcp_lock = threading.Lock()
+        self._tcp_timer = None
+        # Try a single QTYPE=ANY query before the per-type queries. Off by
+        # default: recursive resolvers may answer ANY from a partial cache.
+        self.use_any = use_any
+
+    def _cache_get(self, key):
+        return self._cache.get(key)
+
+    def _cache_put(self, key, ttl, results):
+        self._cache.put(key, ttl, results)
+
+    @staticmethod
+    def _format_txt(r):
+        # TXT strings are almost always ASCII: decode once, not per string
+        try:
+            return b" ".join(r.strings).decode()
+        except (UnicodeDecodeError, TypeError):
+            return " ".join(
+                x.decode(errors='replace') if isinstance(x, bytes) else x for x in r.strings
+            )
+
+    _FORMATTERS = {
+        'MX': lambda r: f"{r.preference} {r.exchange}",
+        'TXT': _format_txt.__func__,
+    }
+
+    def _format(self, answers, rtype):
+        fmt = self._FORMATTERS.get(rtype, str)
+        return [fmt(r) for r in answers]
+
+    def _store(self, key, answers, rtype):
+        results = self._format(answers, rtype)
+        rrset = getattr(answers, 'rrset', answers)
+        ttl = min(getattr(rrset, 'ttl', 60), self.MAX_TTL)
+        self._cache_put(key, ttl, results)
+        return results
 
     def query(self, domain, rtype):
+        from dns.resolver import NoAnswer, NXDOMAIN, Timeout, NoNameservers
+        key = (domain.lower(), rtype)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return list(cached)
+
         results = []
         try:
-            answers = self.resolver.resolve(domain, rtype)
-            for r in answers:
-                if rtype == 'MX':
-                    results.append(f"{r.preference} {r.exchange}")
-                elif rtype == 'TXT':
-                    parts = [x.decode() if isinstance(x, bytes) else x for x in r.strings]
-                    results.append(" ".join(parts))
-                else:
-                    results.append(str(r))
-        except (NoAnswer, NXDOMAIN, NoNameservers, Timeout):
+            answers = self.resolver.resolve(_qname(domain), rtype)
+            results = self._store(key, answers, rtype)
+        except (NoAnswer, NXDOMAIN):
+            # Negative answers are cached briefly to avoid repeating failed lookups
+            self._cache_put(key, self.NEGATIVE_TTL, [])
+        except (NoNameservers, Timeout):
             pass
         except Exception:
             pass
-        return results
+        return list(results)
+
+    @classmethod
+    def _event_loop(cls):
+        with cls._LOOP_LOCK:
+            if cls._LOOP is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="dnsmod", daemon=True).start()
+                atexit.register(loop.call_soon_threadsafe, loop.stop)
+                cls._LOOP = loop
+        return cls._LOOP
+
+    def _nameserver(self):
+        ns = self.resolver.nameservers[0]
+        return getattr(ns, 'address', ns), getattr(ns, 'port', self.resolver.port)
+
+    @classmethod
+    def _make_queries(cls, pairs):
+        # One query per (domain, rtype) with a message id unique in the batch,
+        # as {id: (pair, wire)}
+        pending = {}
+        for pair in pairs:
+            qid = random.getrandbits(16)
+            while qid in pending:
+                qid = random.getrandbits(16)
+            pending[qid] = (pair, struct.pack("!H", qid) + _QUERY_HEADER
+                            + _wire_qname(pair[0]) + _question_tail(pair[1], cls.EDNS_PAYLOAD))
+        return pending
+
+    @staticmethod
+    def _answers_query(response, pair):
+        # Same checks dns.message.Message.is_response makes, against the question we sent
+        import dns.flags
+        import dns.rdataclass
+        import dns.rdatatype
+        if not response.flags & dns.flags.QR or len(response.question) != 1:
+            return False
+        question = response.question[0]
+        return (question.name == _qname(pair[0])
+                and question.rdtype == dns.rdatatype.from_text(pair[1])
+                and question.rdclass == dns.rdataclass.IN)
+
+    def _udp_batch(self, pairs):
+        # Send queries back-to-back on one socket and match replies by
+        # message id, resending unanswered ones every timeout/3 until the
+        # resolver lifetime runs out. Pairs that timed out map to None, so the
+        # resolver does not wait on them a second time; pairs missing from the
+        # result (socket errors, truncated replies) are left to the resolver.
+        import dns.flags
+        import dns.message
+        address, port = self._nameserver()
+        family = socket.AF_INET6 if ':' in address else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        resend_interval = self.resolver.timeout / 3
+        responses = {}
+        try:
+            sock.connect((address, port))
+            for start in range(0, len(pairs), self.BATCH_WINDOW):
+                pending = self._make_queries(pairs[start:start + self.BATCH_WINDOW])
+                now = time.monotonic()
+                deadline = now + self.resolver.lifetime
+                resend_at = now
+                while pending:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        for pair, _ in pending.values():
+                            responses[pair] = None
+                        break
+                    if now >= resend_at:
+                        for _, wire in pending.values():
+                            sock.send(wire)
+                        resend_at = now + resend_interval
+                    ready, _, _ = select.select([sock], [], [], min(deadline, resend_at) - now)
+                    if not ready:
+                        continue
+                    wire = sock.recv(65535)
+                    try:
+                        response = dns.message.from_wire(wire)
+                    except Exception:
+                        continue
+                    entry = pending.get(response.id)
+                    if entry is None or not self._answers_query(response, entry[0]):
+                        continue
+                    del pending[response.id]
+                    # Truncated answers go through the resolver, which retries over TCP
+                    if not response.flags & dns.flags.TC:
+                        responses[entry[0]] = response
+        except OSError:
+            pass
+        finally:
+            sock.close()
+        return responses
+
+    def _ensure_tcp(self):
+        if self._tcp is not None:
+            return self._tcp
+        address, port = self._nameserver()
+        if self.tls:
+            port = 853
+        sock = socket.create_connection((address, port), timeout=self.resolver.timeout)
+        if self.tls:
+            # Opportunistic DoT: nameservers are usually given by IP, so the
+            # certificate is not checked against a hostname
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+            sock = context.wrap_socket(sock)
+        self._tcp = sock
+        return sock
+
+    def _touch_tcp(self):
+        if self._tcp_timer is not None:
+            self._tcp_timer.cancel()
+        self._tcp_timer = threading.Timer(self.TCP_IDLE_TIMEOUT, self.close)
+        self._tcp_timer.daemon = True
+        self._tcp_timer.start()
+
+    def close(self):
+        with self._tcp_lock:
+            if self._tcp is not None:
+                try:
+                    self._tcp.close()
+                except OSError:
+                    pass
+                self._tcp = None
+
+    @staticmethod
+    def _recv_exact(sock, size):
+        buf = b''
+        while len(buf) < size:
+            chunk = sock.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionResetError("nameserver closed the connection")
+            buf += chunk
+        return buf
+
+    def _tcp_window(self, pairs, responses):
+        import dns.exception
+        import dns.message
+        sock = self._ensure_tcp()
+        sock.settimeout(self.resolver.timeout)
+        pending = self._make_queries(pairs)
+        sock.sendall(b"".join(struct.pack("!H", len(wire)) + wire for _, wire in pending.values()))
+
+        while pending:
+            (length,) = struct.unpack("!H", self._recv_exact(sock, 2))
+            try:
+                response = dns.message.from_wire(self._recv_exact(sock, length))
+            except dns.exception.DNSException:
+                continue
+            entry = pending.get(response.id)
+            if entry is None or not self._answers_query(response, entry[0]):
+                continue
+            del pending[response.id]
+            responses[entry[0]] = response
+
+    def _tcp_batch(self, pairs):
+        # Pipeline queries on the shared connection; replies may arrive
+        # in any order and are matched by message id.
+        responses = {}
+        with self._tcp_lock:
+            for start in range(0, len(pairs), self.BATCH_WINDOW):
+                window = pairs[start:start + self.BATCH_WINDOW]
+                for attempt in range(2):
+                    try:
+                        self._tcp_window(window, responses)
+                        break
+                    except (BrokenPipeError, ConnectionResetError):
+                        # Stale keepalive connection: reconnect once and resend
+                        if self._tcp is not None:
+                            self._tcp.close()
+                        self._tcp = None
+                        if attempt:
+                            return responses
+                        window = [p for p in window if p not in responses]
+                    except OSError:
+                        if self._tcp is not None:
+                            self._tcp.close()
+                        self._tcp = None
+                        return responses
+            self._touch_tcp()
+        return responses
+
+    def _from_response(self, domain, rtype, response):
+        import dns.rcode
+        import dns.rdataclass
+        import dns.rdatatype
+        import dns.resolver
+        key = (domain.lower(), rtype)
+        rcode = response.rcode()
+        if rcode == dns.rcode.NXDOMAIN:
+            self._cache_put(key, self.NEGATIVE_TTL, [])
+            return []
+        if rcode != dns.rcode.NOERROR:
+            return None
+        answers = dns.resolver.Answer(
+            _qname(domain), dns.rdatatype.from_text(rtype), dns.rdataclass.IN, response
+        )
+        if answers.rrset is None:
+            self._cache_put(key, self.NEGATIVE_TTL, [])
+            return []
+        return self._store(key, answers, rtype)
+
+    def _any_query(self, domain, types):
+        # One ANY round trip; returns {rtype: results} for the types present.
+        # Servers following RFC 8482 answer with a lone HINFO, which is ignored.
+        import dns.exception
+        import dns.message
+        import dns.query
+        import dns.rcode
+        import dns.rdatatype
+        address, port = self._nameserver()
+        qname = _qname(domain)
+        query = dns.message.make_query(qname, 'ANY', use_edns=0, payload=self.EDNS_PAYLOAD)
+        try:
+            response = dns.query.udp(query, address, timeout=self.resolver.timeout, port=port)
+        except (dns.exception.DNSException, OSError):
+            return {}
+        if response.rcode() != dns.rcode.NOERROR:
+            return {}
+
+        found = {}
+        for rrset in response.answer:
+            if rrset.name != qname:
+                continue
+            rtype = dns.rdatatype.to_text(rrset.rdtype)
+            if rtype == 'HINFO' and 'RFC8482' in rrset.to_text():
+                return {}
+            if rtype in types:
+                found[rtype] = self._store((domain.lower(), rtype), rrset, rtype)
+        return found
+
+    async def _run_async(self, pairs):
+        from dns.resolver import NoAnswer, NXDOMAIN
+        out = {}
+        tasks = [self.aresolver.resolve(_qname(domain), t) for domain, t in pairs]
+        answers = await asyncio.gather(*tasks, return_exceptions=True)
+        for (domain, rtype), res in zip(pairs, answers):
+            key = (domain.lower(), rtype)
+            if isinstance(res, (NoAnswer, NXDOMAIN)):
+                self._cache_put(key, self.NEGATIVE_TTL, [])
+            elif isinstance(res, BaseException):
+                continue
+            else:
+                results = self._store(key, res, rtype)
+                if results:
+                    out[(domain, rtype)] = results
+        return out
+
+    def _resolve(self, pairs):
+        import dns.exception
+        out = {}
+        pending = []
+        for domain, t in pairs:
+            try:
+                _qname(domain)
+            except dns.exception.DNSException:
+                # Malformed names have no records; skip rather than abort the batch
+                continue
+            cached = self._cache_get((domain.lower(), t))
+            if cached is None:
+                pending.append((domain, t))
+            elif cached:
+                out[(domain, t)] = list(cached)
+
+        if pending and self.use_any:
+            wanted = {}
+            for domain, t in pending:
+                wanted.setdefault(domain, set()).add(t)
+            answered = set()
+            for domain, types in wanted.items():
+                for rtype, results in self._any_query(domain, types).items():
+                    answered.add((domain, rtype))
+                    if results:
+                        out[(domain, rtype)] = results
+            pending = [p for p in pending if p not in answered]
+
+        if pending:
+            batch = self._tcp_batch if self.tcp else self._udp_batch
+            answered = set()
+            for (domain, rtype), response in batch(pending).items():
+                if response is None:
+                    # Already waited out the full lifetime; no second timeout
+                    answered.add((domain, rtype))
+                    continue
+                try:
+                    results = self._from_response(domain, rtype, response)
+                except Exception:
+                    continue
+                if results is None:
+                    continue
+                answered.add((domain, rtype))
+                if results:
+                    out[(domain, rtype)] = results
+            pending = [p for p in pending if p not in answered]
+
+        if pending:
+            future = asyncio.run_coroutine_threadsafe(
+                self._run_async(pending), self._event_loop()
+            )
+            out.update(future.result())
+        return out
 
     def run(self, domain, types=None):
         if types is None:
             types = self.DEFAULT_TYPES
 
+        resolved = self._resolve([(domain, t) for t in types])
+        return {rtype: resolved[(domain, rtype)] for rtype in types if (domain, rtype) in resolved}
+
+    def batch_run(self, domains, types=None):
+        # Resolve many domains at once; all queries share the same socket
+        if types is None:
+            types = self.DEFAULT_TYPES
+
+        resolved = self._resolve([(d, t) for d in domains for t in types])
         out = {}
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as exe:
-            future_map = {exe.submit(self.query, domain, t): t for t in types}
-            for future in concurrent.futures.as_completed(future_map):
-                rtype = future_map[future]
-                res = future.result()
-                if res:
-                    out[rtype] = res
+        for (domain, rtype), results in resolved.items():
+            out.setdefault(domain, {})[rtype] = results
         return out
 
 
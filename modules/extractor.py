@@ -1,4 +1,3 @@
-from urllib.parse import urlparse, parse_qs
 import logging
 
 def extract(urls):
@@ -17,15 +16,22 @@ def extract(urls):
     parameterized_urls = set()
     
     for url in urls:
-        parsed = urlparse(url)
-        path = parsed.path
+        # Crawled URLs are absolute, so plain string splits stand in for
+        # urlparse: drop the fragment, then split off the query
+        head, _, query = url.partition('#')[0].partition('?')
         
-        # Identify JS files
-        if path.endswith('.js'):
-            js_files.add(url)
+        # Identify JS files: the URL has a path (a slash after the "//host")
+        # and its last segment, minus any ";params", ends in ".js"
+        host_start = head.find('//') + 2
+        has_path = head.find('/', host_start) != -1
+        if has_path:
+            last_segment = head[head.rfind('/'):]
+            segment_name = last_segment.partition(';')[0]
+            if segment_name.endswith('.js'):
+                js_files.add(url)
             
         # Identify URLs with parameters
-        if parsed.query:
+        if query:
             parameterized_urls.add(url)
             
     logging.info(f"Extraction finished. Found {len(js_files)} JS files and {len(parameterized_urls)} parameterized URLs.")
@@ -3,14 +3,24 @@ Port Scanner Module
 Independent, reusable port scanning functionality
 """
 
+import asyncio
 import socket
+import struct
 import logging
+from dataclasses import dataclass
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import Iterable, List, Dict, Optional, Union
+from modules import resolver
+from modules import synscan
+from modules import uring
 
-# Service mapping for common ports
-SERVICE_MAP = {
+# SO_LINGER with a zero timeout: close() sends RST, so finished probes do
+# not pile up in TIME_WAIT and exhaust ephemeral ports on large scans
+LINGER_RST = struct.pack("ii", 1, 0)
+
+# Service mapping for common ports (read-only)
+SERVICE_MAP = MappingProxyType({
     20: "ftp-data",
     21: "ftp",
     22: "ssh",
@@ -33,7 +43,7 @@ SERVICE_MAP = {
     8080: "http-proxy",
     8443: "https-alt",
     27017: "mongodb"
-}
+})
 
 # Default ports to scan if not specified
 DEFAULT_PORTS = [21, 22, 23, 25, 53, 80, 110, 143, 443, 465, 587, 993, 995, 3306, 3389, 5432, 8080, 8443]
@@ -49,21 +59,18 @@ def _resolve_target(target: str) -> Optional[str]:
     Returns:
         IP address string or None if resolution fails
     """
-    try:
-        ip = socket.gethostbyname(target)
+    # Shared with the other modules, so a repeated host costs no lookup
+    ip = resolver.resolve_a(target)
+    if ip is None:
+        logging.error(f"Failed to resolve {target}")
+    else:
         logging.info(f"Resolved {target} to {ip}")
-        return ip
-    except socket.gaierror as e:
-        logging.error(f"Failed to resolve {target}: {e}")
-        return None
-    except Exception as e:
-        logging.error(f"Unexpected error resolving {target}: {e}")
-        return None
+    return ip
 
 
-def _scan_port(ip: str, port: int, timeout: float) -> Optional[int]:
+async def _scan_port(ip: str, port: int, timeout: float) -> Optional[int]:
     """
-    Scan a single port using TCP connect method
+    Scan a single port using a non-blocking TCP connect
     
     Args:
         ip: Target IP address
@@ -73,16 +80,16 @@ def _scan_port(ip: str, port: int, timeout: float) -> Optional[int]:
     Returns:
         Port number if open, None otherwise
     """
+    loop = asyncio.get_running_loop()
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.settimeout(timeout)
+    sock.setblocking(False)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RST)
     
     try:
-        result = sock.connect_ex((ip, port))
-        if result == 0:
-            logging.debug(f"Port {port} is OPEN on {ip}")
-            return port
-        return None
-    except socket.timeout:
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        logging.debug(f"Port {port} is OPEN on {ip}")
+        return port
+    except asyncio.TimeoutError:
         return None
     except socket.error as e:
         logging.debug(f"Socket error on port {port}: {e}")
@@ -94,82 +101,113 @@ def _scan_port(ip: str, port: int, timeout: float) -> Optional[int]:
         sock.close()
 
 
-def _get_service_name(port: int) -> str:
+async def _scan_ports(ip: str, ports, timeout: float, max_workers: int, open_ports: List[Dict]):
     """
-    Get service name for a port number
+    Scan ports on one event loop with at most max_workers connects in flight
     
     Args:
-        port: Port number
-        
-    Returns:
-        Service name or 'unknown'
-    """
-    return SERVICE_MAP.get(port, "unknown")
-
-
-def _parse_config(config: Optional[Dict]) -> Dict:
-    """
-    Parse and validate configuration dictionary
-    
-    Args:
-        config: Configuration dictionary
-        
-    Returns:
-        Validated configuration with defaults
+        ip: Target IP address
+        ports: Iterable of port numbers
+        timeout: Connection timeout in seconds
+        max_workers: Maximum concurrent connection attempts
+        open_ports: List that open port entries are appended to
     """
-    default_config = {
-        "timeout": 1.5,
-        "ports": DEFAULT_PORTS.copy(),
-        "max_workers": 50,
-        "scan_type": "tcp_connect"
-    }
+    port_iter = iter(ports)
     
-    if config is None:
-        return default_config
+    async def worker():
+        # Workers share one iterator, so each port is scanned exactly once
+        for port in port_iter:
+            if await _scan_port(ip, port, timeout) is not None:
+                open_ports.append({
+                    "port": port,
+                    "service": SERVICE_MAP.get(port, "unknown")
+                })
     
-    # Merge with defaults
-    merged_config = default_config.copy()
+    await asyncio.gather(*(worker() for _ in range(max(max_workers, 1))))
+
+
+@dataclass
+class ScanConfig:
+    """Validated port scan settings, built once per scan"""
     
-    # Handle timeout
-    if "timeout" in config:
-        try:
-            merged_config["timeout"] = float(config["timeout"])
-        except (ValueError, TypeError):
-            logging.warning(f"Invalid timeout value, using default: {default_config['timeout']}")
+    timeout: float = 1.5
+    ports: Iterable[int] = tuple(DEFAULT_PORTS)
+    max_workers: int = 50
+    scan_type: str = "tcp_connect"
+    resolved_ip: Optional[str] = None
+    backend: str = "asyncio"
     
-    # Handle ports
-    if "ports" in config:
-        if isinstance(config["ports"], list):
-            merged_config["ports"] = config["ports"]
-        elif isinstance(config["ports"], tuple) and len(config["ports"]) == 2:
-            # Port range (start, end)
+    @classmethod
+    def from_dict(cls, config: Optional[Dict]) -> "ScanConfig":
+        """
+        Parse and validate a configuration dictionary
+        
+        Args:
+            config: Configuration dictionary
+            
+        Returns:
+            Validated configuration with defaults
+        """
+        scan_config = cls()
+        
+        if config is None:
+            return scan_config
+        
+        # Handle timeout
+        if "timeout" in config:
             try:
-                start, end = int(config["ports"][0]), int(config["ports"][1])
-                merged_config["ports"] = list(range(start, end + 1))
+                scan_config.timeout = float(config["timeout"])
             except (ValueError, TypeError):
-                logging.warning("Invalid port range, using default ports")
-    
-    # Handle max_workers
-    if "max_workers" in config:
-        try:
-            merged_config["max_workers"] = int(config["max_workers"])
-        except (ValueError, TypeError):
-            logging.warning(f"Invalid max_workers value, using default: {default_config['max_workers']}")
-    
-    return merged_config
+                logging.warning(f"Invalid timeout value, using default: {cls.timeout}")
+        
+        # Handle ports
+        if "ports" in config:
+            if isinstance(config["ports"], (list, range)):
+                scan_config.ports = config["ports"]
+            elif isinstance(config["ports"], tuple) and len(config["ports"]) == 2:
+                # Port range (start, end)
+                try:
+                    start, end = int(config["ports"][0]), int(config["ports"][1])
+                    scan_config.ports = range(start, end + 1)
+                except (ValueError, TypeError):
+                    logging.warning("Invalid port range, using default ports")
+        
+        # Handle max_workers
+        if "max_workers" in config:
+            try:
+                scan_config.max_workers = int(config["max_workers"])
+            except (ValueError, TypeError):
+                logging.warning(f"Invalid max_workers value, using default: {cls.max_workers}")
+        
+        # Handle scan type (syn needs raw sockets and falls back to tcp_connect)
+        if config.get("scan_type") in ("tcp_connect", "syn"):
+            scan_config.scan_type = config["scan_type"]
+        
+        # Handle I/O backend (io_uring is only chosen by callers that found it usable)
+        if config.get("backend") in ("asyncio", "io_uring"):
+            scan_config.backend = config["backend"]
+        
+        # Handle pre-resolved IP (caller already did the DNS lookup)
+        if config.get("resolved_ip"):
+            scan_config.resolved_ip = config["resolved_ip"]
+        
+        return scan_config
 
 
-def run(target: str, config: Optional[Dict] = None) -> Dict:
+def run(target: str, config: Optional[Union[Dict, ScanConfig]] = None) -> Dict:
     """
     Execute port scan on target
     
     Args:
         target: Domain name or IP address
-        config: Optional configuration dictionary
+        config: Optional ScanConfig or configuration dictionary
                 {
                     "timeout": float (seconds),
-                    "ports": list or tuple(start, end),
-                    "max_workers": int
+                    "ports": list, range or tuple(start, end),
+                    "max_workers": int,
+                    "scan_type": "tcp_connect" or "syn" (optional),
+                    "resolved_ip": str (optional, skips DNS resolution),
+                    "backend": "asyncio" or "io_uring" (optional)
                 }
     
     Returns:
@@ -189,17 +227,20 @@ def run(target: str, config: Optional[Dict] = None) -> Dict:
     """
     logging.info(f"Starting port scan for target: {target}")
     
-    # Parse configuration
-    scan_config = _parse_config(config)
+    # Parse configuration (a ScanConfig is used as given)
+    scan_config = config if isinstance(config, ScanConfig) else ScanConfig.from_dict(config)
+    # Either may be downgraded below when its scanner is unavailable
+    scan_type = scan_config.scan_type
+    backend = scan_config.backend
     
-    # Resolve target to IP
-    resolved_ip = _resolve_target(target)
+    # Resolve target to IP unless the caller already did
+    resolved_ip = scan_config.resolved_ip or _resolve_target(target)
     
     if resolved_ip is None:
         return {
             "port_scan": {
                 "resolved_ip": None,
-                "scan_type": scan_config["scan_type"],
+                "scan_type": scan_type,
                 "open_ports": [],
                 "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "error": f"Failed to resolve target: {target}"
@@ -209,27 +250,59 @@ def run(target: str, config: Optional[Dict] = None) -> Dict:
     # Prepare result structure
     open_ports = []
     
+    # Check for raw sockets up front rather than failing partway into the scan
+    if scan_type == "syn" and not synscan.available():
+        logging.warning("SYN scan needs raw sockets (root), falling back to TCP connect")
+        scan_type = "tcp_connect"
+    
     try:
-        # Perform threaded port scanning
-        with ThreadPoolExecutor(max_workers=scan_config["max_workers"]) as executor:
-            # Submit all port scan tasks
-            future_to_port = {
-                executor.submit(_scan_port, resolved_ip, port, scan_config["timeout"]): port
-                for port in scan_config["ports"]
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_port):
-                port = future_to_port[future]
-                try:
-                    result = future.result()
-                    if result is not None:
-                        open_ports.append({
-                            "port": result,
-                            "service": _get_service_name(result)
-                        })
-                except Exception as e:
-                    logging.error(f"Error scanning port {port}: {e}")
+        if scan_type == "syn":
+            try:
+                # One raw socket, no handshake completed per port
+                for port in synscan.scan_ports(
+                    resolved_ip,
+                    scan_config.ports,
+                    scan_config.timeout,
+                    scan_config.max_workers
+                ):
+                    open_ports.append({
+                        "port": port,
+                        "service": SERVICE_MAP.get(port, "unknown")
+                    })
+            except OSError as e:
+                logging.warning(f"SYN scan unavailable, falling back to TCP connect: {e}")
+                open_ports.clear()
+                scan_type = "tcp_connect"
+        
+        # Each stage below only runs if the previous one was skipped or failed
+        if scan_type == "tcp_connect" and backend == "io_uring":
+            try:
+                # All connects and their timeouts go through one ring
+                for port in uring.scan_ports(
+                    resolved_ip,
+                    scan_config.ports,
+                    scan_config.timeout,
+                    scan_config.max_workers
+                ):
+                    open_ports.append({
+                        "port": port,
+                        "service": SERVICE_MAP.get(port, "unknown")
+                    })
+            except Exception as e:
+                # Any ring failure, not just setup errors, is retried on asyncio
+                logging.warning(f"io_uring scan failed, falling back to asyncio: {e}")
+                open_ports.clear()
+                backend = "asyncio"
+        
+        if scan_type == "tcp_connect" and backend == "asyncio":
+            # Non-blocking connects on one event loop
+            asyncio.run(_scan_ports(
+                resolved_ip,
+                scan_config.ports,
+                scan_config.timeout,
+                scan_config.max_workers,
+                open_ports
+            ))
         
         # Sort results by port number
         open_ports.sort(key=lambda x: x["port"])
@@ -239,29 +312,18 @@ def run(target: str, config: Optional[Dict] = None) -> Dict:
         return {
             "port_scan": {
                 "resolved_ip": resolved_ip,
-                "scan_type": scan_config["scan_type"],
+                "scan_type": scan_type,
                 "open_ports": open_ports,
                 "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
         }
         
-    except KeyboardInterrupt:
-        logging.warning("Port scan interrupted by user")
-        return {
-            "port_scan": {
-                "resolved_ip": resolved_ip,
-                "scan_type": scan_config["scan_type"],
-                "open_ports": open_ports,
-                "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "error": "Scan interrupted by user"
-            }
-        }
     except Exception as e:
         logging.error(f"Unexpected error during port scan: {e}")
         return {
             "port_scan": {
                 "resolved_ip": resolved_ip,
-                "scan_type": scan_config["scan_type"],
+                "scan_type": scan_type,
                 "open_ports": open_ports,
                 "scan_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "error": str(e)
@@ -1,269 +1,327 @@
+import gzip
 import os
 from datetime import datetime
+from operator import itemgetter
 
-def create_report(data, target, format_type="txt", filename=None):
+# Set once the reports directory is known to exist, so batch runs skip the stat
+_REPORTS_DIR_READY = False
+
+# portscan and banner always fill these keys, so records are unpacked in C
+# instead of through two .get calls each
+_PORT_SERVICE = itemgetter('port', 'service')
+_PORT_BANNER = itemgetter('port', 'banner')
+
+# Characters that must not reach the HTML report unescaped (same set as html.escape)
+HTML_ESCAPE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
+
+# Static page head and styles, pre-encoded; only the target and date are filled in
+HTML_HEADER = b"""<!DOCTYPE html>
+<html>
+<head>
+<title>Recon Report - %s</title>
+<style>
+body { font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }
+.header { background: linear-gradient(to right, #0066cc, #0099ff); 
+          color: white; padding: 20px; border-radius: 10px; }
+.card { background: #f8f9fa; padding: 15px; margin: 10px 0; 
+        border-left: 4px solid #0066cc; border-radius: 5px; }
+.badge { background: #28a745; color: white; padding: 3px 8px; 
+         border-radius: 10px; font-size: 0.9em; }
+.tech-item { background: #e9ecef; padding: 8px; margin: 5px 0; border-radius: 5px; }
+</style>
+</head>
+<body>
+
+<div class="header">
+<h1>Recon Report</h1>
+<h3>Target: %s</h3>
+<p>Date: %s</p>
+</div>
+
+<h2> Findings</h2>
+"""
+
+HTML_FOOTER = b"""
+<hr>
+<p style="text-align: center; color: #666;">
+Report Generated by Recon Tool | ITSOLERA Red Team Gamma
+</p>
+</body>
+</html>"""
+
+def _escape(value):
+    # One C-level table walk per field
+    return str(value).translate(HTML_ESCAPE)
+
+def create_report(data, target, format_type="txt", filename=None, compress=False):
         
-    os.makedirs("reports", exist_ok=True)
+    global _REPORTS_DIR_READY
+    if not _REPORTS_DIR_READY:
+        os.makedirs("reports", exist_ok=True)
+        _REPORTS_DIR_READY = True
+    
+    # One clock read per report, shared by the filename and the report body
+    now = datetime.now()
     
     if not filename:
-        timestamp = datetime.now().strftime("%Y_%m_%d_%H_%M")
+        timestamp = now.strftime("%Y_%m_%d_%H_%M")
         filename = f"reports/{target}_{timestamp}"
     
     if format_type == "txt" or format_type == "text":
         filename += ".txt"
-        return create_txt_report(data, target, filename)
+        return create_txt_report(data, target, filename, now)
     
     else:  # html
-        filename += ".html"
-        return create_html_report(data, target, filename)
+        filename += ".html.gz" if compress else ".html"
+        return create_html_report(data, target, filename, now, compress)
 
-def create_txt_report(data, target, filepath):
+def create_txt_report(data, target, filepath, now=None):
     #text report
-    with open(filepath, 'w') as f:
-        f.write(f"{'='*50}\n")
-        f.write(f"SCAN REPORT\n")
-        f.write(f"{'='*50}\n")
-        f.write(f"Target: {target}\n")
-        f.write(f"Date: {datetime.now()}\n")
-        
-        if 'port_scan' in data:
-            f.write(f"\n[PORT SCAN]\n")
-            scan = data['port_scan']
-            if 'error' in scan:
-                f.write(f"Error: {scan['error']}\n")
-            else:
-                ports = scan.get('open_ports', [])
-                if ports:
-                    for p in ports:
-                        f.write(f"  Port {p.get('port')}: {p.get('service', '?')}\n")
-                else:
-                    f.write(f"  No open ports\n")
-        
-        if 'dns_enum' in data:
-            f.write(f"\n[DNS]\n")
-            dns = data['dns_enum']
-            if 'error' in dns:
-                f.write(f"Error: {dns['error']}\n")
-            else:
-                records = dns.get('records', {})
-                for rtype, values in records.items():
-                    f.write(f"  {rtype}:\n")
-                    for v in values:
-                        f.write(f"    • {v}\n")
-        
-        if 'subdomain_enum' in data:
-            f.write(f"\n[SUBDOMAINS]\n")
-            sub = data['subdomain_enum']
-            if 'error' in sub:
-                f.write(f"Error: {sub['error']}\n")
-            else:
-                subs = sub.get('subdomains', [])
-                for s in subs:
-                    f.write(f"  • {s}\n")
-        
-        if 'whois_lookup' in data:
-            f.write(f"\n[WHOIS]\n")
-            whois = data['whois_lookup']
-            if 'error' in whois:
-                f.write(f"Error: {whois['error']}\n")
-            else:
-                info = whois.get('whois_data', '')
-                if info:
-                    f.write(f"  {info}\n")
-        
-        if 'banner_grab' in data:
-            f.write(f"\n[BANNERS]\n")
-            banner = data['banner_grab']
-            if 'error' in banner:
-                f.write(f"Error: {banner['error']}\n")
-            else:
-                banners = banner.get('banners', [])
-                for b in banners:
-                    f.write(f"  Port {b.get('port')}:\n")
-                    banner_text = b.get('banner', '')
-                    if banner_text:
-                        f.write(f"    {banner_text[:100]}...\n")
-        
-        if 'tech_detect' in data:
-            f.write(f"\n[TECHNOLOGIES]\n")
-            tech = data['tech_detect']
-            if 'error' in tech:
-                f.write(f"Error: {tech['error']}\n")
-            else:
-                techs = tech.get('technologies', [])
-                for t in techs:
-                    f.write(f"  • {t}\n")
+    now = now or datetime.now()
+    lines = [
+        f"{'='*50}\n",
+        f"SCAN REPORT\n",
+        f"{'='*50}\n",
+        f"Target: {target}\n",
+        f"Date: {now}\n",
+    ]
+    
+    for key, renderer in TXT_RENDERERS.items():
+        # Missing or empty sections get no heading; errors and "nothing found" still do
+        section = data.get(key)
+        if section:
+            renderer(section, lines)
+    
+    # Whole report in one writelines; the large buffer turns it into a few writes
+    with open(filepath, 'w', buffering=1 << 16) as f:
+        f.writelines(lines)
     
     print(f"[+] Text report: {filepath}")
     return filepath
+
+def _txt_port_scan(scan, lines):
+    lines.append(f"\n[PORT SCAN]\n")
+    if 'error' in scan:
+        lines.append(f"Error: {scan['error']}\n")
+    else:
+        ports = scan.get('open_ports') or ()
+        if ports:
+            lines.extend(f"  Port {port}: {service}\n" for port, service in map(_PORT_SERVICE, ports))
+        else:
+            lines.append(f"  No open ports\n")
+
+def _txt_dns_enum(dns, lines):
+    lines.append(f"\n[DNS]\n")
+    if 'error' in dns:
+        lines.append(f"Error: {dns['error']}\n")
+    else:
+        records = dns.get('records') or {}
+        for rtype, values in records.items():
+            lines.append(f"  {rtype}:\n")
+            lines.extend(f"    • {v}\n" for v in values)
+
+def _txt_subdomain_enum(sub, lines):
+    lines.append(f"\n[SUBDOMAINS]\n")
+    if 'error' in sub:
+        lines.append(f"Error: {sub['error']}\n")
+    else:
+        subs = sub.get('subdomains') or ()
+        lines.extend(f"  • {s}\n" for s in subs)
+
+def _txt_whois_lookup(whois, lines):
+    lines.append(f"\n[WHOIS]\n")
+    if 'error' in whois:
+        lines.append(f"Error: {whois['error']}\n")
+    else:
+        info = whois.get('whois_data', '')
+        if info:
+            lines.append(f"  {info}\n")
+
+def _txt_banner_grab(banner, lines):
+    lines.append(f"\n[BANNERS]\n")
+    if 'error' in banner:
+        lines.append(f"Error: {banner['error']}\n")
+    else:
+        banners = banner.get('banners') or ()
+        for port, banner_text in map(_PORT_BANNER, banners):
+            lines.append(f"  Port {port}:\n")
+            if banner_text:
+                lines.append(f"    {banner_text[:100]}...\n")
+
+def _txt_tech_detect(tech, lines):
+    lines.append(f"\n[TECHNOLOGIES]\n")
+    if 'error' in tech:
+        lines.append(f"Error: {tech['error']}\n")
+    else:
+        techs = tech.get('technologies') or ()
+        lines.extend(f"  • {t}\n" for t in techs)
+
     #HTML REPORT
-def create_html_report(data, target, filepath):
+def create_html_report(data, target, filepath, now=None, compress=False):
     
-    html = f"""<!DOCTYPE html>
-<html>
-<head>
-<title>Recon Report - {target}</title>
-<style>
-body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-.header {{ background: linear-gradient(to right, #0066cc, #0099ff); 
-          color: white; padding: 20px; border-radius: 10px; }}
-.card {{ background: #f8f9fa; padding: 15px; margin: 10px 0; 
-        border-left: 4px solid #0066cc; border-radius: 5px; }}
-.badge {{ background: #28a745; color: white; padding: 3px 8px; 
-         border-radius: 10px; font-size: 0.9em; }}
-.tech-item {{ background: #e9ecef; padding: 8px; margin: 5px 0; border-radius: 5px; }}
-</style>
-</head>
-<body>
-
-<div class="header">
-<h1>Recon Report</h1>
-<h3>Target: {target}</h3>
-<p>Date: {datetime.now()}</p>
-</div>
+    if compress:
+        # Level 1: the markup is repetitive, so even the fastest level shrinks it many times over
+        out = gzip.open(filepath, 'wb', compresslevel=1)
+    else:
+        # Write fragments straight to a large file buffer; no whole-report string
+        out = open(filepath, 'wb', buffering=1 << 16)
+    with out as f:
+        _write_html(f.write, data, target, now or datetime.now())
+    
+    print(f"[+] HTML report: {filepath}")
+    return filepath
 
-<h2> Findings</h2>
-"""
+def _write_html(write, data, target, now):
     
-    if 'port_scan' in data:
-        scan = data['port_scan']
-        html += f'<div class="card"><h3>PORT SCAN</h3>'
-        if 'error' in scan:
-            html += f'<p style="color:red;">Error: {scan["error"]}</p>'
-        else:
-            ports = scan.get('open_ports', [])
-            if ports:
-                html += '<ul>'
-                for p in ports:
-                    html += f'<li>Port {p.get("port")}: {p.get("service", "unknown")}</li>'
-                html += '</ul>'
-            else:
-                html += '<p>No open ports</p>'
-        html += '</div>'
+    target = _escape(target).encode('utf-8')
     
-    if 'dns_enum' in data:
-        dns = data['dns_enum']
-        html += f'<div class="card"><h3>DNS ENUMERATION</h3>'
-        if 'error' in dns:
-            html += f'<p style="color:red;">Error: {dns["error"]}</p>'
-        else:
-            records = dns.get('records', {})
-            if records:
-                html += '<ul>'
-                for rtype, values in records.items():
-                    for v in values:
-                        html += f'<li><strong>{rtype}:</strong> {v}</li>'
-                html += '</ul>'
-            else:
-                html += '<p>No DNS records</p>'
-        html += '</div>'
+    write(HTML_HEADER % (target, target, str(now).encode('utf-8')))
+    
+    # Only the rendered sections need encoding; the report is always UTF-8
+    def append(fragment):
+        write(fragment.encode('utf-8'))
+    
+    for key, renderer in HTML_RENDERERS.items():
+        # Missing or empty sections get no card; errors and "nothing found" still do
+        section = data.get(key)
+        if section:
+            renderer(section, append)
     
-    if 'subdomain_enum' in data:
-        sub = data['subdomain_enum']
-        html += f'<div class="card"><h3>SUBDOMAIN ENUMERATION</h3>'
-        if 'error' in sub:
-            html += f'<p style="color:red;">Error: {sub["error"]}</p>'
+    write(HTML_FOOTER)
+
+def _html_port_scan(scan, append):
+    append(f'<div class="card"><h3>PORT SCAN</h3>')
+    if 'error' in scan:
+        append(f'<p style="color:red;">Error: {_escape(scan["error"])}</p>')
+    else:
+        ports = scan.get('open_ports') or ()
+        if ports:
+            # One join per list, so each section is a single write
+            append('<ul>' + ''.join(
+                f'<li>Port {port}: {_escape(service)}</li>' for port, service in map(_PORT_SERVICE, ports)
+            ) + '</ul>')
         else:
-            subs = sub.get('subdomains', [])
-            if subs:
-                html += '<ul>'
-                for s in subs:
-                    html += f'<li>{s}</li>'
-                html += '</ul>'
-            else:
-                html += '<p>No subdomains found</p>'
-        html += '</div>'
+            append('<p>No open ports</p>')
+    append('</div>')
 
-    if 'whois_lookup' in data:
-        whois = data['whois_lookup']
-        html += f'<div class="card"><h3>WHOIS LOOKUP</h3>'
-        if 'error' in whois:
-            html += f'<p style="color:red;">Error: {whois["error"]}</p>'
+def _html_dns_enum(dns, append):
+    append(f'<div class="card"><h3>DNS ENUMERATION</h3>')
+    if 'error' in dns:
+        append(f'<p style="color:red;">Error: {_escape(dns["error"])}</p>')
+    else:
+        records = dns.get('records') or {}
+        if records:
+            append('<ul>' + ''.join(
+                f'<li><strong>{_escape(rtype)}:</strong> {_escape(v)}</li>'
+                for rtype, values in records.items() for v in values
+            ) + '</ul>')
         else:
-            info = whois.get('whois_data', '')
-            if info:
-                html += f'<pre>{info}</pre>'
-            else:
-                html += '<p>No WHOIS data</p>'
-        html += '</div>'
-    
-    if 'banner_grab' in data:
-        banner = data['banner_grab']
-        html += f'<div class="card"><h3>BANNER GRABBING</h3>'
-        if 'error' in banner:
-            html += f'<p style="color:red;">Error: {banner["error"]}</p>'
+            append('<p>No DNS records</p>')
+    append('</div>')
+
+def _html_subdomain_enum(sub, append):
+    append(f'<div class="card"><h3>SUBDOMAIN ENUMERATION</h3>')
+    if 'error' in sub:
+        append(f'<p style="color:red;">Error: {_escape(sub["error"])}</p>')
+    else:
+        subs = sub.get('subdomains') or ()
+        if subs:
+            append('<ul>' + ''.join(f'<li>{_escape(s)}</li>' for s in subs) + '</ul>')
         else:
-            banners = banner.get('banners', [])
-            if banners:
-                for b in banners:
-                    banner_text = b.get('banner', '')
-                    if banner_text:
-                        html += f'<p><strong>Port {b.get("port")}:</strong> {banner_text[:200]}...</p>'
-            else:
-                html += '<p>No banners grabbed</p>'
-        html += '</div>'
-    
-    if 'tech_detect' in data:
-        tech = data['tech_detect']
-        html += f'<div class="card"><h3>TECHNOLOGY DETECTION</h3>'
-        if 'error' in tech:
-            html += f'<p style="color:red;">Error: {tech["error"]}</p>'
+            append('<p>No subdomains found</p>')
+    append('</div>')
+
+def _html_whois_lookup(whois, append):
+    append(f'<div class="card"><h3>WHOIS LOOKUP</h3>')
+    if 'error' in whois:
+        append(f'<p style="color:red;">Error: {_escape(whois["error"])}</p>')
+    else:
+        info = whois.get('whois_data', '')
+        if info:
+            append(f'<pre>{_escape(info)}</pre>')
         else:
-            techs = tech.get('technologies', [])
-            if techs:
-                html += '<div class="tech-grid">'
-                for t in techs:
-                    html += f'<div class="tech-item">{t}</div>'
-                html += '</div>'
-            else:
-                html += '<p>No technologies detected</p>'
-        html += '</div>'
-    if 'crawler' in data:
-        urls = data['crawler'].get("urls", [])
-        html += f'<div class="card"><h3>CRAWLER RESULTS ({len(urls)})</h3>'
-        if urls:
-            html += '<div style="max-height: 300px; overflow-y: auto;"><ul>'
-            for url in urls:
-                html += f'<li><a href="{url}" target="_blank">{url}</a></li>'
-            html += '</ul></div>'
+            append('<p>No WHOIS data</p>')
+    append('</div>')
+
+def _html_banner_grab(banner, append):
+    append(f'<div class="card"><h3>BANNER GRABBING</h3>')
+    if 'error' in banner:
+        append(f'<p style="color:red;">Error: {_escape(banner["error"])}</p>')
+    else:
+        banners = banner.get('banners') or ()
+        if banners:
+            for port, banner_text in map(_PORT_BANNER, banners):
+                if banner_text:
+                    append(f'<p><strong>Port {port}:</strong> {_escape(banner_text[:200])}...</p>')
         else:
-            html += '<p>No URLs found</p>'
-        html += '</div>'
+            append('<p>No banners grabbed</p>')
+    append('</div>')
 
-    if 'extractor' in data:
-        html += '<div class="card"><h3>EXTRACTOR RESULTS</h3>'
-        ext_data = data['extractor']
-        js_files = ext_data.get("js_files", [])
-        params = ext_data.get("parameters", [])
-        
-        if js_files:
-            html += f'<h4>JavaScript Files ({len(js_files)})</h4><ul>'
-            for js in js_files:
-                html += f'<li>{js}</li>'
-            html += '</ul>'
-        
-        if params:
-            html += f'<h4>Parameters ({len(params)})</h4><ul>'
-            for param in params:
-                html += f'<li>{param}</li>'
-            html += '</ul>'
-            
-        if not js_files and not params:
-            html += '<p>No data extracted</p>'
-        html += '</div>'
-        
-    
-    html += f"""
-<hr>
-<p style="text-align: center; color: #666;">
-Report Generated by Recon Tool | ITSOLERA Red Team Gamma
-</p>
-</body>
-</html>"""
+def _html_tech_detect(tech, append):
+    append(f'<div class="card"><h3>TECHNOLOGY DETECTION</h3>')
+    if 'error' in tech:
+        append(f'<p style="color:red;">Error: {_escape(tech["error"])}</p>')
+    else:
+        techs = tech.get('technologies') or ()
+        if techs:
+            append('<div class="tech-grid">' + ''.join(
+                f'<div class="tech-item">{_escape(t)}</div>' for t in techs
+            ) + '</div>')
+        else:
+            append('<p>No technologies detected</p>')
+    append('</div>')
+
+def _html_crawler(crawler, append):
+    urls = crawler.get("urls") or ()
+    append(f'<div class="card"><h3>CRAWLER RESULTS ({len(urls)})</h3>')
+    if urls:
+        append('<div style="max-height: 300px; overflow-y: auto;"><ul>' + ''.join(
+            f'<li><a href="{u}" target="_blank">{u}</a></li>' for u in map(_escape, urls)
+        ) + '</ul></div>')
+    else:
+        append('<p>No URLs found</p>')
+    append('</div>')
+
+def _html_extractor(ext_data, append):
+    append('<div class="card"><h3>EXTRACTOR RESULTS</h3>')
+    js_files = ext_data.get("js_files") or ()
+    params = ext_data.get("parameters") or ()
     
-    with open(filepath, 'w') as f:
-        f.write(html)
+    if js_files:
+        append(f'<h4>JavaScript Files ({len(js_files)})</h4><ul>'
+               + ''.join(f'<li>{_escape(js)}</li>' for js in js_files) + '</ul>')
     
-    print(f"[+] HTML report: {filepath}")
-    return filepath
+    if params:
+        append(f'<h4>Parameters ({len(params)})</h4><ul>'
+               + ''.join(f'<li>{_escape(param)}</li>' for param in params) + '</ul>')
+        
+    if not js_files and not params:
+        append('<p>No data extracted</p>')
+    append('</div>')
+
+# Report sections in output order, each rendered by one function
+TXT_RENDERERS = {
+    'port_scan': _txt_port_scan,
+    'dns_enum': _txt_dns_enum,
+    'subdomain_enum': _txt_subdomain_enum,
+    'whois_lookup': _txt_whois_lookup,
+    'banner_grab': _txt_banner_grab,
+    'tech_detect': _txt_tech_detect,
+}
 
+HTML_RENDERERS = {
+    'port_scan': _html_port_scan,
+    'dns_enum': _html_dns_enum,
+    'subdomain_enum': _html_subdomain_enum,
+    'whois_lookup': _html_whois_lookup,
+    'banner_grab': _html_banner_grab,
+    'tech_detect': _html_tech_detect,
+    'crawler': _html_crawler,
+    'extractor': _html_extractor,
+}
@@ -0,0 +1,118 @@
+"""
+Resolver Module
+Hostname resolution shared by all modules, with a short in-process cache
+"""
+
+import asyncio
+import functools
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+# Seconds a resolution is reused before the system resolver is asked again
+CACHE_TTL = 15
+
+FAMILIES = {"A": socket.AF_INET, "AAAA": socket.AF_INET6}
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve(host: str, rrtype: str, bucket: int) -> str:
+    # bucket only makes the cache key expire every CACHE_TTL seconds;
+    # failures raise and are therefore never cached
+    infos = socket.getaddrinfo(host, None, FAMILIES.get(rrtype, socket.AF_INET), socket.SOCK_STREAM)
+    return infos[0][4][0]
+
+
+def resolve(host: str, rrtype: str = "A") -> Optional[str]:
+    """
+    Resolve a hostname to one address, reusing recent answers
+
+    Args:
+        host: Domain name or IP address
+        rrtype: "A" for IPv4 or "AAAA" for IPv6
+
+    Returns:
+        IP address string or None if resolution fails
+    """
+    try:
+        # Address literals are parsed locally and kept out of the cache
+        return socket.getaddrinfo(host, None, FAMILIES.get(rrtype, socket.AF_INET), socket.SOCK_STREAM, 0,
+                                  socket.AI_NUMERICHOST)[0][4][0]
+    except (OSError, UnicodeError):
+        pass
+    try:
+        return _resolve(host.lower(), rrtype, int(time.time()) // CACHE_TTL)
+    except (OSError, UnicodeError):
+        return None
+
+
+def resolve_a(host: str) -> Optional[str]:
+    """Resolve a hostname to its IPv4 address (cached)"""
+    return resolve(host, "A")
+
+
+async def resolve_many(hosts: Iterable[str], rrtype: str = "A") -> List[Optional[str]]:
+    """
+    Resolve several hostnames concurrently, reusing recent answers
+
+    Each lookup runs in the loop's default executor, so N uncached hosts
+    cost about one resolver round trip instead of N.
+
+    Args:
+        hosts: Domain names or IP addresses
+        rrtype: "A" for IPv4 or "AAAA" for IPv6
+
+    Returns:
+        IP address (or None if resolution failed) for each host, in order
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(None, resolve, host, rrtype) for host in hosts))
+
+
+class CachingResolver:
+    """
+    Process-wide cache of formatted DNS answers keyed by (qname, qtype)
+
+    DNSModule stores results here, so every instance created during a run
+    (and any other module given the shared instance) reuses them until
+    the record TTL expires.
+    """
+
+    MAX_ENTRIES = 1024
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        # (qname, qtype) -> (expiry, results), oldest first
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def instance(cls) -> "CachingResolver":
+        """Return the shared cache, creating it on first use"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, ttl: float, results):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
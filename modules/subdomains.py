@@ -1,46 +1,89 @@
 import requests
 import sys
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get_subdomains(domain):
-  
-    subdomains = set() #auto remove dupes
-    
-    print(f"Scanning {domain}...")
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
 
+#one pooled session so repeated lookups reuse the tls connection to each source
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "Mozilla/5.0 (compatible; Offensive-Recon-Tool)"
+#transient failures get retried instead of losing the whole source; read
+#timeouts are not retried, a slow source already used up its whole timeout
+_RETRY = Retry(total=3, read=0, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+               allowed_methods=("GET",))
+_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_RETRY))
+
+def _fetch_hackertarget(domain):
+    subdomains = set()
     try:  #src 1, hackertarget for speed
         url = f"https://api.hackertarget.com/hostsearch/?q={domain}"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            for line in response.text.split('\n'):
-                if "," in line:
-                    sub = line.split(',')[0]
-                    if domain in sub:
-                        subdomains.add(sub)
-    except:
-        pass #if src one is down
-
-    if not subdomains:  #scr 2, crt.sh
-        try:
-            url = f"https://crt.sh/?q=%.{domain}&output=json"
-            response = requests.get(url, timeout=20)
+        #streamed, so the body is handled line by line and never held whole
+        with _SESSION.get(url, timeout=10, stream=True) as response:
             if response.status_code == 200:
-                for entry in response.json():
-                    sub = entry['name_value']
-                    if "\n" in sub:
-                        for s in sub.split('\n'): subdomains.add(s)
-                    else:
-                        subdomains.add(sub)
-        except:
-            pass
-
-    clean_list = [s for s in subdomains if "*" not in s] #remove wildcard results 
-    
-    return sorted(clean_list)
+                #without a declared charset iter_lines would yield bytes
+                response.encoding = response.encoding or 'utf-8'
+                #match on the domain suffix, so notexample.com isnt taken for example.com
+                needle = domain.lower()
+                suffix = "." + needle
+                for line in response.iter_lines(decode_unicode=True):
+                    if "," in line:
+                        sub = line.split(',', 1)[0].lower()
+                        if '*' in sub:
+                            continue #wildcard results
+                        if sub == needle or sub.endswith(suffix):
+                            subdomains.add(sub)
+    except requests.RequestException as e:
+        logging.warning(f"HackerTarget lookup failed for {domain}: {e}") #if src one is down
+        return set()
+    return subdomains
+
+def _fetch_crtsh(domain):
+    subdomains = set()
+    try:  #src 2, crt.sh
+        url = f"https://crt.sh/?q=%.{domain}&output=json"
+        response = _SESSION.get(url, timeout=20)
+        if response.status_code == 200:
+            data = orjson.loads(response.content) if ORJSON_AVAILABLE else json.loads(response.content)
+            #name_value holds one or more names separated by newlines
+            subdomains.update(s for entry in data for s in entry['name_value'].lower().splitlines() if '*' not in s)
+            subdomains.discard('')
+    except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+        logging.warning(f"crt.sh lookup failed for {domain}: {e}")
+        return set()
+    return subdomains
+
+def _stream_subdomains(domain):
+    seen = set() #suppress dupes on the fly
+
+    print(f"Scanning {domain}...", file=sys.stderr) #keep stdout to hostnames only
+
+    #both sources at once, crt.sh usually has far more records anyway;
+    #each is yielded as soon as it answers instead of waiting for both
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futures = [ex.submit(_fetch_hackertarget, domain), ex.submit(_fetch_crtsh, domain)]
+        for f in as_completed(futures):
+            for sub in f.result() - seen:
+                seen.add(sub)
+                yield sub
+
+def get_subdomains(domain, stream=False):
+    #stream=True gives a generator of unsorted hostnames, for piping from the cli
+    if stream:
+        return _stream_subdomains(domain)
+    return sorted(_stream_subdomains(domain)) #already deduped by the stream
 
 if __name__ == "__main__":  #cli usage, as the task requires direct cli usage
     if len(sys.argv) > 1:
-        results = get_subdomains(sys.argv[1])
-        for r in results:
-            print(r)
+        for r in get_subdomains(sys.argv[1], stream=True):
+            print(r, flush=True) #lines go out right away even when piped
+        _SESSION.close()
     else:
         print("Usage: python subdomains.py <domain>")
@@ -0,0 +1,136 @@
+"""
+SYN Scanner
+Half-open TCP scanning over one raw socket (Linux, root only)
+
+SYN packets are crafted with struct and sent from a single raw socket;
+SYN/ACK replies mark a port open. No handshake is completed and no
+per-port socket is created. The kernel answers each SYN/ACK with a RST
+because it has no matching connection, which tears the half-open
+connection down on the target.
+"""
+
+import os
+import random
+import select
+import socket
+import struct
+import time
+from typing import Iterable, List
+
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+
+# sport, dport, seq, ack, data offset, flags, window, checksum, urgent
+_TCP_HEADER = struct.Struct("!HHIIBBHHH")
+# src, dst, zero, protocol, TCP length
+_PSEUDO_HEADER = struct.Struct("!4s4sBBH")
+
+RECV_BUFFER = 4 * 1024 * 1024
+
+
+def available() -> bool:
+    """
+    Check whether raw TCP sockets can be opened
+
+    Returns:
+        True when running as root (or with CAP_NET_RAW) on Linux
+    """
+    if not hasattr(os, "geteuid") or not hasattr(socket, "SOCK_RAW"):
+        return False
+    try:
+        socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP).close()
+        return True
+    except OSError:
+        return False
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    while total >> 16:
+        total = (total & 0xFFFF) + (total >> 16)
+    return ~total & 0xFFFF
+
+
+def _source_ip(ip: str) -> str:
+    # Let the routing table pick the outgoing address; UDP connect sends nothing
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect((ip, 9))
+        return s.getsockname()[0]
+
+
+def _syn_packet(src: bytes, dst: bytes, sport: int, dport: int, seq: int) -> bytes:
+    header = _TCP_HEADER.pack(sport, dport, seq, 0, 5 << 4, TCP_SYN, 65535, 0, 0)
+    pseudo = _PSEUDO_HEADER.pack(src, dst, 0, socket.IPPROTO_TCP, len(header))
+    return header[:16] + struct.pack("!H", _checksum(pseudo + header)) + header[18:]
+
+
+def scan_ports(ip: str, ports: Iterable[int], timeout: float, max_workers: int) -> List[int]:
+    """
+    SYN scan, sending max_workers probes between reads of the reply queue
+
+    Args:
+        ip: Target IPv4 address
+        ports: Port numbers to scan
+        timeout: Seconds to wait for replies after the last SYN is sent
+        max_workers: SYNs sent per batch
+
+    Returns:
+        Open port numbers, in reply order
+
+    Raises:
+        OSError: If the raw socket cannot be opened (e.g. not root)
+    """
+    dst = socket.inet_aton(ip)
+    src = socket.inet_aton(_source_ip(ip))
+    sport = random.randint(40000, 60999)
+    seq = random.getrandbits(32)
+    batch = max(1, max_workers)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER)
+        sock.setblocking(False)
+
+        wanted = set()
+        open_ports = []
+
+        def drain(wait: float):
+            readable, _, _ = select.select([sock], [], [], wait)
+            while readable:
+                try:
+                    packet = sock.recv(65535)
+                except BlockingIOError:
+                    return
+                ihl = (packet[0] & 0x0F) * 4
+                if packet[12:16] != dst or len(packet) < ihl + 20:
+                    continue
+                rport, dport, _, ack, _, flags = struct.unpack_from("!HHIIBB", packet, ihl)
+                if dport != sport or rport not in wanted or ack != (seq + 1) & 0xFFFFFFFF:
+                    continue
+                if flags & (TCP_SYN | TCP_ACK) == TCP_SYN | TCP_ACK:
+                    wanted.discard(rport)
+                    open_ports.append(rport)
+                elif flags & TCP_RST:
+                    # Closed: no need to keep waiting for this port
+                    wanted.discard(rport)
+
+        for sent, port in enumerate(ports, 1):
+            wanted.add(port)
+            sock.sendto(_syn_packet(src, dst, sport, port, seq), (ip, 0))
+            if sent % batch == 0:
+                # Read replies between batches so the receive queue never overflows
+                drain(0)
+
+        deadline = time.monotonic() + timeout
+        while wanted:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            drain(remaining)
+    finally:
+        sock.close()
+
+    return open_ports
@@ -7,9 +7,14 @@ Date: January 2025
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import re
 import json
-from typing import Dict, List, Set
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Dict, List, Optional, Set
 from urllib.parse import urlparse
 
 # Try to import Wappalyzer
@@ -21,12 +26,240 @@ except ImportError:
     print("[!] Wappalyzer not available. Install with: pip install python-Wappalyzer")
 
 try:
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
     BS4_AVAILABLE = True
 except ImportError:
     BS4_AVAILABLE = False
     print("[!] BeautifulSoup not available. Install with: pip install beautifulsoup4")
 
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Optional: lexbor-backed parser, much faster than BeautifulSoup for meta tag lookups
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Optional: SIMD multi-pattern matcher for the page signature sweep
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# lxml parser objects are not thread-safe, so each thread builds its own
+_LXML_LOCAL = threading.local()
+
+
+def _lxml_parser():
+    """This thread's lxml HTML parser, created on first use"""
+    parser = getattr(_LXML_LOCAL, 'parser', None)
+    if parser is None:
+        # Pages are handed to lxml as UTF-8 bytes: it refuses str input that
+        # carries an XML encoding declaration
+        parser = _LXML_LOCAL.parser = lxml.html.HTMLParser(encoding='utf-8')
+    return parser
+
+# BeautifulSoup fallback: only meta and script tags are consulted, so build nothing else
+TECH_STRAINER = SoupStrainer(['meta', 'script']) if BS4_AVAILABLE else None
+
+# Read-only fingerprint tables, built once at import
+
+# Page signatures: technology -> keywords, matched against the lowercased HTML
+CMS_PATTERNS = MappingProxyType({
+    'WordPress': (
+        '/wp-content/',
+        '/wp-includes/',
+        'wp-json',
+        'wordpress'
+    ),
+    'Joomla': (
+        '/components/com_',
+        'joomla',
+        '/media/jui/'
+    ),
+    'Drupal': (
+        'drupal',
+        '/sites/default/',
+        'drupal.js'
+    ),
+    'Magento': (
+        'magento',
+        '/skin/frontend/',
+        'mage/cookies'
+    ),
+    'Shopify': (
+        'shopify',
+        'cdn.shopify.com',
+        'shopify-buy'
+    ),
+    'Wix': (
+        'wix.com',
+        'wixstatic.com',
+        'parastorage.com'
+    ),
+    'Squarespace': (
+        'squarespace',
+        'static1.squarespace.com'
+    ),
+    'Ghost': (
+        'ghost.io',
+        'content/themes/'
+    )
+})
+
+FRAMEWORK_PATTERNS = MappingProxyType({
+    'Django': ('csrftoken', '__admin_media_prefix__'),
+    'Ruby on Rails': ('csrf-param', 'rails', 'action="/rails/'),
+    'Laravel': ('laravel', 'laravel_session', 'csrf-token'),
+    'Flask': ('werkzeug',),
+    'Express.js': ('x-powered-by: express',),
+    'Spring': ('jsessionid', 'spring'),
+    'ASP.NET': ('__viewstate', '__eventvalidation'),
+    'Phoenix': ('phoenix', '_csrf_token'),
+    'Symfony': ('symfony', 'sf-toolbar'),
+    'CodeIgniter': ('codeigniter', 'ci_session')
+})
+
+JS_LIBRARIES = MappingProxyType({
+    # Frontend Frameworks
+    'React': ('react.js', 'react.min.js', 'react-dom', '_react'),
+    'Vue.js': ('vue.js', 'vue.min.js', 'vuejs', '__vue__'),
+    'Angular': ('angular.js', 'angular.min.js', 'ng-', '@angular'),
+    'Svelte': ('svelte', '_svelte'),
+    'Ember.js': ('ember.js', 'ember.min.js'),
+
+    # JavaScript Libraries
+    'jQuery': ('jquery.min.js', 'jquery.js', 'jquery-'),
+    'Lodash': ('lodash.js', 'lodash.min.js'),
+    'Underscore.js': ('underscore.js', 'underscore.min.js'),
+    'Moment.js': ('moment.js', 'moment.min.js'),
+    'Axios': ('axios.js', 'axios.min.js'),
+
+    # CSS Frameworks
+    'Bootstrap': ('bootstrap.js', 'bootstrap.min.js', 'bootstrap.css'),
+    'Tailwind CSS': ('tailwind.css', 'tailwindcss'),
+    'Foundation': ('foundation.js', 'foundation.css'),
+    'Bulma': ('bulma.css', 'bulma.min.css'),
+    'Materialize': ('materialize.js', 'materialize.css'),
+
+    # Charting Libraries
+    'Chart.js': ('chart.js', 'chart.min.js'),
+    'D3.js': ('d3.js', 'd3.min.js'),
+    'Highcharts': ('highcharts.js',),
+    'Plotly': ('plotly.js',),
+
+    # Other Popular Libraries
+    'Three.js': ('three.js', 'three.min.js'),
+    'GSAP': ('gsap.js', 'gsap.min.js'),
+    'Anime.js': ('anime.js', 'anime.min.js'),
+    'AOS': ('aos.js', 'aos.css'),
+    'Swiper': ('swiper.js', 'swiper.css'),
+    'Slick': ('slick.js', 'slick.css')
+})
+
+# Header -> CDN name
+CDN_HEADERS = MappingProxyType({
+    'CF-RAY': 'Cloudflare',
+    'X-Amz-Cf-Id': 'Amazon CloudFront',
+    'X-Cache': 'Varnish/CDN',
+    'X-CDN': 'CDN'
+})
+
+# Matched against lowercased <script src> values
+ANALYTICS_PATTERNS = MappingProxyType({
+    'Google Analytics': ('google-analytics', 'ga.js', 'gtag.js'),
+    'Google Tag Manager': ('googletagmanager.com/gtm.js',),
+    'Facebook Pixel': ('facebook.com/tr', 'fbq('),
+    'Hotjar': ('hotjar.com/c/hotjar-',)
+})
+
+# Exact lowercased cookie names
+COOKIE_PATTERNS = MappingProxyType({
+    'PHP': frozenset({'phpsessid'}),
+    'ASP.NET': frozenset({'asp.net_sessionid', '.aspxauth', 'aspxauth'}),
+    'Java/JSP': frozenset({'jsessionid'}),
+    'Laravel': frozenset({'laravel_session'}),
+    'Django': frozenset({'sessionid', 'csrftoken'}),
+    'Express.js': frozenset({'connect.sid'}),
+    'ColdFusion': frozenset({'cfid', 'cftoken'})
+})
+
+
+FETCH_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _adapter() -> HTTPAdapter:
+    """Shared connection pool, so detectors reuse keep-alive connections and TLS sessions"""
+    return HTTPAdapter()
+
+
+def _make_session() -> requests.Session:
+    """New session (own cookie jar) on the shared connection pool"""
+    session = requests.Session()
+    session.headers.update(FETCH_HEADERS)
+    session.mount('https://', _adapter())
+    session.mount('http://', _adapter())
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def _wappalyzer():
+    """Load the Wappalyzer fingerprint database once per process"""
+    return Wappalyzer.latest()
+
+
+def _signature_matcher(*tables):
+    # Longest first, so where keywords share a start the longest one is reported
+    keywords = sorted({p for table in tables for patterns in table.values() for p in patterns},
+                      key=len, reverse=True)
+    # Zero-width lookahead so overlapping keywords are all found in one pass
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+    # A reported keyword also stands for every shorter keyword it starts with
+    implied = {k: frozenset(j for j in keywords if k.startswith(j)) for k in keywords}
+    return pattern, implied
+
+
+def _hyperscan_database(keywords):
+    # Every byte hex-escaped, so keywords are matched literally; one report per
+    # keyword, ignoring ASCII case so the page needs no lowercased copy
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[''.join('\\x%02x' % b for b in k.encode()).encode() for k in keywords],
+        ids=list(range(len(keywords))),
+        elements=len(keywords),
+        flags=[hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_CASELESS] * len(keywords),
+    )
+    return db
+
+
+_SIGNATURE_RE, _IMPLIED = _signature_matcher(CMS_PATTERNS, FRAMEWORK_PATTERNS, JS_LIBRARIES)
+_SIGNATURE_KEYWORDS = tuple(_IMPLIED)
+_SIGNATURE_DB = _hyperscan_database(_SIGNATURE_KEYWORDS) if HYPERSCAN_AVAILABLE else None
+
+
+def _find_signatures(html: str) -> Set[str]:
+    """Return every CMS, framework and JavaScript library keyword present in the page"""
+    if _SIGNATURE_DB is not None:
+        # Hyperscan reports overlapping matches itself, so no prefix expansion is needed
+        ids = set()
+        _SIGNATURE_DB.scan(html.encode('utf-8'), match_event_handler=lambda match_id, *_: ids.add(match_id))
+        return {_SIGNATURE_KEYWORDS[i] for i in ids}
+    # One lowercased copy: re with IGNORECASE is about twice as slow as lower() plus a plain scan
+    return set().union(*map(_IMPLIED.__getitem__, set(_SIGNATURE_RE.findall(html.lower()))))
+
 
 class TechnologyDetector:
     """
@@ -39,6 +272,8 @@ class TechnologyDetector:
     6. Cookie analysis
     """
     
+    __slots__ = ('target', 'verbose', 'technologies', '_compiled', '_session')
+    
     def __init__(self, target: str, verbose: bool = False):
         self.target = target
         self.verbose = verbose
@@ -54,7 +289,16 @@ class TechnologyDetector:
             'security': [],
             'all_detected': set()
         }
-        
+        # Set once _compile_results has turned all_detected into a sorted list
+        self._compiled = False
+        # Per-detector cookie jar, so cookies from one target never reach another
+        self._session = _make_session()
+        
+    def _record(self, category: str, tech: str, name: Optional[str] = None):
+        """Add a finding to its category and its (bare) name to all_detected"""
+        self.technologies[category].append(tech)
+        self.technologies['all_detected'].add(tech if name is None else name)
+    
     def detect_all(self) -> Dict:
         """Run all detection methods"""
         print(f"\n[*] Starting technology detection for {self.target}")
@@ -66,31 +310,50 @@ class TechnologyDetector:
         
         print(f"[+] Successfully fetched {url}")
         
-        # Method 1: Wappalyzer (most comprehensive)
+        # requests decodes the body again (charset detection included) on every
+        # .text access, so decode once and share the string
+        html = response.text
+        
+        # Method 1: Wappalyzer (most comprehensive, and by far the slowest).
+        # It runs on a worker thread while methods 2-6 run here; it only adds
+        # to the all_detected set, and the parsers and matchers below spend
+        # most of their time in C code that lets it proceed.
+        wappalyzer = None
         if WAPPALYZER_AVAILABLE:
-            wappalyzer_results = self._detect_with_wappalyzer(url, response)
-            print(f"[+] Wappalyzer detected: {len(wappalyzer_results)} technologies")
+            pool = ThreadPoolExecutor(max_workers=1)
+            wappalyzer = pool.submit(self._detect_with_wappalyzer, url, response, html)
+            pool.shutdown(wait=False)
         
         # Method 2: HTTP Headers
         header_results = self._analyze_headers(response)
         print(f"[+] Header analysis found: {len(header_results)} indicators")
         
+        # One sweep over the page finds every signature used by methods 3 and 4
+        found = _find_signatures(html)
+        
         # Method 3: HTML Content
-        html_results = self._analyze_html_content(response.text)
+        html_results = self._analyze_html_content(found)
         print(f"[+] HTML analysis found: {len(html_results)} technologies")
         
         # Method 4: JavaScript Libraries
-        js_results = self._detect_javascript_libraries(response.text)
+        js_results = self._detect_javascript_libraries(found)
         print(f"[+] JavaScript detection found: {len(js_results)} libraries")
         
         # Method 5: Meta Tags
-        meta_results = self._analyze_meta_tags(response.text)
+        meta_results = self._analyze_meta_tags(html)
         print(f"[+] Meta tag analysis found: {len(meta_results)} indicators")
         
         # Method 6: Cookies
-        cookie_results = self._analyze_cookies(response.cookies)
+        # Only cookies set while fetching this page, redirect hops included
+        cookie_results = self._analyze_cookies(
+            cookie for r in (*response.history, response) for cookie in r.cookies
+        )
         print(f"[+] Cookie analysis found: {len(cookie_results)} indicators")
         
+        if wappalyzer is not None:
+            wappalyzer_results = wappalyzer.result()
+            print(f"[+] Wappalyzer detected: {len(wappalyzer_results)} technologies")
+        
         # Compile results
         self._compile_results()
         
@@ -98,21 +361,12 @@ class TechnologyDetector:
     
     def _fetch_webpage(self) -> tuple:
         """Fetch webpage with proper headers"""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        }
-        
         # Try HTTPS first, then HTTP
         for protocol in ['https', 'http']:
             try:
                 url = f"{protocol}://{self.target}"
-                response = requests.get(
+                response = self._session.get(
                     url, 
-                    headers=headers, 
                     timeout=15, 
                     allow_redirects=True,
                     verify=False  # For sites with SSL issues
@@ -127,14 +381,14 @@ class TechnologyDetector:
         
         return None, None
     
-    def _detect_with_wappalyzer(self, url: str, response) -> Set[str]:
+    def _detect_with_wappalyzer(self, url: str, response, html: str) -> Set[str]:
         """Detect technologies using Wappalyzer"""
         if not WAPPALYZER_AVAILABLE:
             return set()
         
         try:
-            wappalyzer = Wappalyzer.latest()
-            webpage = WebPage(url, response.text, response.headers)
+            wappalyzer = _wappalyzer()
+            webpage = WebPage(url, html, response.headers)
             detected = wappalyzer.analyze(webpage)
             
             # Add to all_detected
@@ -155,169 +409,60 @@ class TechnologyDetector:
         if 'Server' in headers:
             server = headers['Server']
             results.append(f"Server: {server}")
-            self.technologies['web_server'].append(server)
-            self.technologies['all_detected'].add(server.split('/')[0])
+            self._record('web_server', server, server.split('/')[0])
         
         # X-Powered-By
         if 'X-Powered-By' in headers:
             powered_by = headers['X-Powered-By']
             results.append(f"Powered-By: {powered_by}")
-            self.technologies['programming_languages'].append(powered_by)
-            self.technologies['all_detected'].add(powered_by.split('/')[0])
+            self._record('programming_languages', powered_by, powered_by.split('/')[0])
         
         # X-AspNet-Version
         if 'X-AspNet-Version' in headers:
             aspnet = headers['X-AspNet-Version']
             results.append(f"ASP.NET: {aspnet}")
-            self.technologies['frameworks'].append(f"ASP.NET {aspnet}")
-            self.technologies['all_detected'].add('ASP.NET')
+            self._record('frameworks', f"ASP.NET {aspnet}", 'ASP.NET')
         
         # X-Generator
         if 'X-Generator' in headers:
             generator = headers['X-Generator']
             results.append(f"Generator: {generator}")
-            self.technologies['cms'].append(generator)
-            self.technologies['all_detected'].add(generator)
+            self._record('cms', generator)
         
         # CDN Detection from headers
-        cdn_headers = {
-            'CF-RAY': 'Cloudflare',
-            'X-Amz-Cf-Id': 'Amazon CloudFront',
-            'X-Cache': 'Varnish/CDN',
-            'X-CDN': 'CDN'
-        }
-        
-        for header, cdn_name in cdn_headers.items():
+        for header, cdn_name in CDN_HEADERS.items():
             if header in headers:
                 results.append(f"CDN: {cdn_name}")
-                self.technologies['cdn'].append(cdn_name)
-                self.technologies['all_detected'].add(cdn_name)
+                self._record('cdn', cdn_name)
         
         return results
     
-    def _analyze_html_content(self, html: str) -> List[str]:
-        """Analyze HTML content for technology signatures"""
+    def _analyze_html_content(self, found: Set[str]) -> List[str]:
+        """Analyze HTML content for technology signatures (keywords from _find_signatures)"""
         results = []
-        html_lower = html.lower()
         
         # CMS Detection
-        cms_patterns = {
-            'WordPress': [
-                '/wp-content/',
-                '/wp-includes/',
-                'wp-json',
-                'wordpress'
-            ],
-            'Joomla': [
-                '/components/com_',
-                'joomla',
-                '/media/jui/'
-            ],
-            'Drupal': [
-                'drupal',
-                '/sites/default/',
-                'drupal.js'
-            ],
-            'Magento': [
-                'magento',
-                '/skin/frontend/',
-                'mage/cookies'
-            ],
-            'Shopify': [
-                'shopify',
-                'cdn.shopify.com',
-                'shopify-buy'
-            ],
-            'Wix': [
-                'wix.com',
-                'wixstatic.com',
-                'parastorage.com'
-            ],
-            'Squarespace': [
-                'squarespace',
-                'static1.squarespace.com'
-            ],
-            'Ghost': [
-                'ghost.io',
-                'content/themes/'
-            ]
-        }
-        
-        for cms, patterns in cms_patterns.items():
-            if any(pattern in html_lower for pattern in patterns):
+        for cms, patterns in CMS_PATTERNS.items():
+            if not found.isdisjoint(patterns):
                 results.append(f"CMS: {cms}")
-                self.technologies['cms'].append(cms)
-                self.technologies['all_detected'].add(cms)
+                self._record('cms', cms)
         
         # Framework Detection
-        framework_patterns = {
-            'Django': ['csrftoken', '__admin_media_prefix__'],
-            'Ruby on Rails': ['csrf-param', 'rails', 'action="/rails/'],
-            'Laravel': ['laravel', 'laravel_session', 'csrf-token'],
-            'Flask': ['werkzeug'],
-            'Express.js': ['x-powered-by: express'],
-            'Spring': ['jsessionid', 'spring'],
-            'ASP.NET': ['__viewstate', '__eventvalidation'],
-            'Phoenix': ['phoenix', '_csrf_token'],
-            'Symfony': ['symfony', 'sf-toolbar'],
-            'CodeIgniter': ['codeigniter', 'ci_session']
-        }
-        
-        for framework, patterns in framework_patterns.items():
-            if any(pattern in html_lower for pattern in patterns):
+        for framework, patterns in FRAMEWORK_PATTERNS.items():
+            if not found.isdisjoint(patterns):
                 results.append(f"Framework: {framework}")
-                self.technologies['frameworks'].append(framework)
-                self.technologies['all_detected'].add(framework)
+                self._record('frameworks', framework)
         
         return results
     
-    def _detect_javascript_libraries(self, html: str) -> List[str]:
-        """Detect JavaScript libraries and frameworks"""
+    def _detect_javascript_libraries(self, found: Set[str]) -> List[str]:
+        """Detect JavaScript libraries and frameworks (keywords from _find_signatures)"""
         results = []
-        html_lower = html.lower()
-        
-        js_libraries = {
-            # Frontend Frameworks
-            'React': ['react.js', 'react.min.js', 'react-dom', '_react'],
-            'Vue.js': ['vue.js', 'vue.min.js', 'vuejs', '__vue__'],
-            'Angular': ['angular.js', 'angular.min.js', 'ng-', '@angular'],
-            'Svelte': ['svelte', '_svelte'],
-            'Ember.js': ['ember.js', 'ember.min.js'],
-            
-            # JavaScript Libraries
-            'jQuery': ['jquery.min.js', 'jquery.js', 'jquery-'],
-            'Lodash': ['lodash.js', 'lodash.min.js'],
-            'Underscore.js': ['underscore.js', 'underscore.min.js'],
-            'Moment.js': ['moment.js', 'moment.min.js'],
-            'Axios': ['axios.js', 'axios.min.js'],
-            
-            # CSS Frameworks
-            'Bootstrap': ['bootstrap.js', 'bootstrap.min.js', 'bootstrap.css'],
-            'Tailwind CSS': ['tailwind.css', 'tailwindcss'],
-            'Foundation': ['foundation.js', 'foundation.css'],
-            'Bulma': ['bulma.css', 'bulma.min.css'],
-            'Materialize': ['materialize.js', 'materialize.css'],
-            
-            # Charting Libraries
-            'Chart.js': ['chart.js', 'chart.min.js'],
-            'D3.js': ['d3.js', 'd3.min.js'],
-            'Highcharts': ['highcharts.js'],
-            'Plotly': ['plotly.js'],
-            
-            # Other Popular Libraries
-            'Three.js': ['three.js', 'three.min.js'],
-            'GSAP': ['gsap.js', 'gsap.min.js'],
-            'Anime.js': ['anime.js', 'anime.min.js'],
-            'AOS': ['aos.js', 'aos.css'],
-            'Swiper': ['swiper.js', 'swiper.css'],
-            'Slick': ['slick.js', 'slick.css']
-        }
         
-        for library, patterns in js_libraries.items():
-            if any(pattern in html_lower for pattern in patterns):
+        for library, patterns in JS_LIBRARIES.items():
+            if not found.isdisjoint(patterns):
                 results.append(library)
-                self.technologies['javascript_libraries'].append(library)
-                self.technologies['all_detected'].add(library)
+                self._record('javascript_libraries', library)
         
         return results
     
@@ -325,36 +470,41 @@ class TechnologyDetector:
         """Analyze meta tags for technology indicators"""
         results = []
         
-        if not BS4_AVAILABLE:
+        # lxml raises on an empty document; there is nothing to find anyway
+        if not html.strip() or not (SELECTOLAX_AVAILABLE or LXML_AVAILABLE or BS4_AVAILABLE):
             return results
         
         try:
-            soup = BeautifulSoup(html, 'html.parser')
+            if SELECTOLAX_AVAILABLE:
+                # C parser with CSS selectors; no Python object per tag
+                tree = LexborHTMLParser(html)
+                generator = tree.css_first('meta[name="generator"]')
+                gen_content = generator.attributes.get('content') if generator else None
+                script_srcs = [script.attributes.get('src') or '' for script in tree.css('script[src]')]
+            elif LXML_AVAILABLE:
+                # Attribute lookups straight on the lxml tree, no BeautifulSoup wrapper
+                root = lxml.html.fromstring(html.encode('utf-8'), parser=_lxml_parser())
+                generator = next(iter(root.xpath("//meta[@name='generator']")), None)
+                gen_content = generator.get('content') if generator is not None else None
+                script_srcs = root.xpath("//script[@src]/@src")
+            else:
+                soup = BeautifulSoup(html, 'html.parser', parse_only=TECH_STRAINER)
+                generator = soup.find('meta', attrs={'name': 'generator'})
+                gen_content = generator.get('content') if generator else None
+                script_srcs = [script.get('src', '') for script in soup.find_all('script', src=True)]
             
             # Generator meta tag
-            generator = soup.find('meta', attrs={'name': 'generator'})
-            if generator and generator.get('content'):
-                gen_content = generator.get('content')
+            if gen_content:
                 results.append(f"Generator: {gen_content}")
-                self.technologies['cms'].append(gen_content)
-                self.technologies['all_detected'].add(gen_content.split()[0])
-            
-            # Analytics detection from meta tags
-            analytics_patterns = {
-                'Google Analytics': ['google-analytics', 'ga.js', 'gtag.js'],
-                'Google Tag Manager': ['googletagmanager.com/gtm.js'],
-                'Facebook Pixel': ['facebook.com/tr', 'fbq('],
-                'Hotjar': ['hotjar.com/c/hotjar-']
-            }
+                self._record('cms', gen_content, gen_content.split()[0])
             
-            scripts = soup.find_all('script', src=True)
-            for script in scripts:
-                src = script.get('src', '').lower()
-                for analytics, patterns in analytics_patterns.items():
+            # Analytics detection from script sources
+            for src in script_srcs:
+                src = src.lower()
+                for analytics, patterns in ANALYTICS_PATTERNS.items():
                     if any(pattern in src for pattern in patterns):
                         results.append(f"Analytics: {analytics}")
-                        self.technologies['analytics'].append(analytics)
-                        self.technologies['all_detected'].add(analytics)
+                        self._record('analytics', analytics)
         
         except Exception as e:
             if self.verbose:
@@ -366,35 +516,25 @@ class TechnologyDetector:
         """Analyze cookies for technology indicators"""
         results = []
         
-        cookie_patterns = {
-            'PHP': ['phpsessid'],
-            'ASP.NET': ['asp.net_sessionid', 'aspxauth'],
-            'Java/JSP': ['jsessionid'],
-            'Laravel': ['laravel_session'],
-            'Django': ['sessionid', 'csrftoken'],
-            'Express.js': ['connect.sid'],
-            'ColdFusion': ['cfid', 'cftoken']
-        }
-        
-        cookie_names = [cookie.name.lower() for cookie in cookies]
+        cookie_names = {cookie.name.lower() for cookie in cookies}
         
-        for tech, patterns in cookie_patterns.items():
-            if any(pattern in ' '.join(cookie_names) for pattern in patterns):
+        for tech, patterns in COOKIE_PATTERNS.items():
+            if not cookie_names.isdisjoint(patterns):
                 results.append(f"Cookie indicator: {tech}")
-                self.technologies['programming_languages'].append(tech)
-                self.technologies['all_detected'].add(tech)
+                self._record('programming_languages', tech)
         
         return results
     
     def _compile_results(self):
         """Compile and clean up results"""
-        # Remove duplicates
+        # Remove duplicates, keeping the order they were detected in
         for key in self.technologies:
             if isinstance(self.technologies[key], list):
-                self.technologies[key] = list(set(self.technologies[key]))
+                self.technologies[key] = list(dict.fromkeys(self.technologies[key]))
         
         # Convert set to sorted list
-        self.technologies['all_detected'] = sorted(list(self.technologies['all_detected']))
+        self.technologies['all_detected'] = sorted(self.technologies['all_detected'])
+        self._compiled = True
     
     def print_results(self):
         """Print formatted results"""
@@ -429,15 +569,16 @@ class TechnologyDetector:
     
     def to_json(self) -> str:
         """Export results as JSON"""
-        # Convert set to list for JSON serialization
-        export_data = self.technologies.copy()
-        export_data['all_detected'] = sorted(list(export_data['all_detected']))
-        return json.dumps(export_data, indent=2)
+        return json.dumps(self.to_dict(), indent=2)
     
     def to_dict(self) -> Dict:
         """Return results as dictionary"""
+        if self._compiled:
+            # all_detected is already a sorted list
+            return self.technologies
+        # Convert set to list for JSON serialization
         result = self.technologies.copy()
-        result['all_detected'] = sorted(list(result['all_detected']))
+        result['all_detected'] = sorted(result['all_detected'])
         return result
 
 
@@ -0,0 +1,255 @@
+"""
+io_uring Connect Scanner
+Batched TCP connect scanning over raw io_uring syscalls (Linux only)
+
+Each port gets a CONNECT SQE linked to a LINK_TIMEOUT SQE, so one
+io_uring_enter call submits a whole batch of connects with their
+timeouts and reaps whatever has completed. Only ctypes and the standard
+library are used; no liburing is required.
+"""
+
+import ctypes
+import errno
+import functools
+import mmap
+import os
+import socket
+import struct
+import sys
+from typing import Iterable, List
+
+# Syscall numbers are shared by all Linux architectures with the generic table
+SYS_IO_URING_SETUP = 425
+SYS_IO_URING_ENTER = 426
+
+IORING_SETUP_SINGLE_ISSUER = 1 << 12
+IORING_SETUP_DEFER_TASKRUN = 1 << 13
+IORING_FEAT_SINGLE_MMAP = 1 << 0
+IORING_ENTER_GETEVENTS = 1 << 0
+IORING_OFF_SQ_RING = 0
+IORING_OFF_CQ_RING = 0x8000000
+IORING_OFF_SQES = 0x10000000
+
+IORING_OP_LINK_TIMEOUT = 15
+IORING_OP_CONNECT = 16
+IOSQE_IO_LINK = 1 << 2
+
+SQE_SIZE = 64
+CQE_SIZE = 16
+# close() sends RST instead of leaving the probe socket in TIME_WAIT
+_LINGER_RST = struct.pack("ii", 1, 0)
+
+# opcode, flags, ioprio, fd, off, addr, len, op_flags, user_data
+_SQE = struct.Struct("=BBHiQQIIQ")
+_CQE = struct.Struct("=QiI")
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.syscall.restype = ctypes.c_long
+
+
+class _Params(ctypes.Structure):
+    _fields_ = [
+        ("sq_entries", ctypes.c_uint32),
+        ("cq_entries", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("sq_thread_cpu", ctypes.c_uint32),
+        ("sq_thread_idle", ctypes.c_uint32),
+        ("features", ctypes.c_uint32),
+        ("wq_fd", ctypes.c_uint32),
+        ("resv", ctypes.c_uint32 * 3),
+        # io_sqring_offsets
+        ("sq_head", ctypes.c_uint32),
+        ("sq_tail", ctypes.c_uint32),
+        ("sq_ring_mask", ctypes.c_uint32),
+        ("sq_ring_entries", ctypes.c_uint32),
+        ("sq_flags", ctypes.c_uint32),
+        ("sq_dropped", ctypes.c_uint32),
+        ("sq_array", ctypes.c_uint32),
+        ("sq_resv1", ctypes.c_uint32),
+        ("sq_user_addr", ctypes.c_uint64),
+        # io_cqring_offsets
+        ("cq_head", ctypes.c_uint32),
+        ("cq_tail", ctypes.c_uint32),
+        ("cq_ring_mask", ctypes.c_uint32),
+        ("cq_ring_entries", ctypes.c_uint32),
+        ("cq_overflow", ctypes.c_uint32),
+        ("cq_cqes", ctypes.c_uint32),
+        ("cq_flags", ctypes.c_uint32),
+        ("cq_resv1", ctypes.c_uint32),
+        ("cq_user_addr", ctypes.c_uint64),
+    ]
+
+
+def _setup(entries: int, flags: int):
+    params = _Params(flags=flags)
+    fd = _libc.syscall(SYS_IO_URING_SETUP, ctypes.c_uint(entries), ctypes.byref(params))
+    if fd < 0:
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+    return fd, params
+
+
+class _Ring:
+    """A single-issuer io_uring instance with its SQ/CQ rings mapped"""
+
+    def __init__(self, entries: int):
+        try:
+            # Completions are only run when we ask for them, on this thread
+            self.fd, p = _setup(entries, IORING_SETUP_SINGLE_ISSUER | IORING_SETUP_DEFER_TASKRUN)
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                raise
+            # Kernels before 6.1 reject these flags
+            self.fd, p = _setup(entries, 0)
+
+        try:
+            sq_size = p.sq_array + p.sq_entries * 4
+            cq_size = p.cq_cqes + p.cq_entries * CQE_SIZE
+            prot = mmap.PROT_READ | mmap.PROT_WRITE
+            if p.features & IORING_FEAT_SINGLE_MMAP:
+                self.sq = self.cq = mmap.mmap(self.fd, max(sq_size, cq_size), mmap.MAP_SHARED,
+                                              prot, offset=IORING_OFF_SQ_RING)
+            else:
+                self.sq = mmap.mmap(self.fd, sq_size, mmap.MAP_SHARED, prot, offset=IORING_OFF_SQ_RING)
+                self.cq = mmap.mmap(self.fd, cq_size, mmap.MAP_SHARED, prot, offset=IORING_OFF_CQ_RING)
+            self.sqes = mmap.mmap(self.fd, p.sq_entries * SQE_SIZE, mmap.MAP_SHARED, prot,
+                                  offset=IORING_OFF_SQES)
+        except Exception:
+            os.close(self.fd)
+            raise
+
+        self.p = p
+        self.sq_mask = struct.unpack_from("I", self.sq, p.sq_ring_mask)[0]
+        self.cq_mask = struct.unpack_from("I", self.cq, p.cq_ring_mask)[0]
+        self.sq_tail = struct.unpack_from("I", self.sq, p.sq_tail)[0]
+        self.to_submit = 0
+
+    def push(self, opcode, flags, fd, off, addr, length, user_data):
+        index = self.sq_tail & self.sq_mask
+        _SQE.pack_into(self.sqes, index * SQE_SIZE, opcode, flags, 0, fd, off, addr, length, 0, user_data)
+        # Zero the remaining fields (buf_index, personality, splice_fd_in, addr3, pad)
+        self.sqes[index * SQE_SIZE + _SQE.size:(index + 1) * SQE_SIZE] = bytes(SQE_SIZE - _SQE.size)
+        struct.pack_into("I", self.sq, self.p.sq_array + index * 4, index)
+        self.sq_tail = (self.sq_tail + 1) & 0xFFFFFFFF
+        self.to_submit += 1
+
+    def enter(self, min_complete: int):
+        # Publish the new tail, then submit and wait in one syscall
+        struct.pack_into("I", self.sq, self.p.sq_tail, self.sq_tail)
+        while True:
+            ret = _libc.syscall(SYS_IO_URING_ENTER, self.fd, self.to_submit, min_complete,
+                                IORING_ENTER_GETEVENTS, None, 0)
+            if ret >= 0:
+                self.to_submit -= ret
+                return
+            err = ctypes.get_errno()
+            if err != errno.EINTR:
+                raise OSError(err, os.strerror(err))
+
+    def completions(self):
+        head = struct.unpack_from("I", self.cq, self.p.cq_head)[0]
+        tail = struct.unpack_from("I", self.cq, self.p.cq_tail)[0]
+        while head != tail:
+            offset = self.p.cq_cqes + (head & self.cq_mask) * CQE_SIZE
+            user_data, res, _ = _CQE.unpack_from(self.cq, offset)
+            head = (head + 1) & 0xFFFFFFFF
+            yield user_data, res
+        struct.pack_into("I", self.cq, self.p.cq_head, head)
+
+    def close(self):
+        self.sqes.close()
+        if self.cq is not self.sq:
+            self.cq.close()
+        self.sq.close()
+        os.close(self.fd)
+
+
+@functools.lru_cache(maxsize=None)
+def available() -> bool:
+    """
+    Check once whether this kernel lets us create an io_uring instance
+
+    Returns:
+        True on Linux when io_uring_setup succeeds (it may be disabled by
+        sysctl or seccomp, e.g. in containers)
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        _Ring(2).close()
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def scan_ports(ip: str, ports: Iterable[int], timeout: float, max_workers: int) -> List[int]:
+    """
+    TCP connect scan with up to max_workers connects in flight on one ring
+
+    Args:
+        ip: Target IPv4 address
+        ports: Port numbers to scan
+        timeout: Connection timeout in seconds
+        max_workers: Maximum concurrent connection attempts
+
+    Returns:
+        Open port numbers, in completion order
+
+    Raises:
+        OSError: If the ring cannot be set up or used
+    """
+    window = max(1, min(max_workers, 4096))
+    # Two SQEs (connect + linked timeout) per port in flight
+    ring = _Ring(1 << (2 * window - 1).bit_length())
+    timespec = ctypes.create_string_buffer(
+        struct.pack("qq", int(timeout), int((timeout % 1) * 1e9)), 16
+    )
+    packed_ip = socket.inet_aton(ip)
+    # user_data slot -> (socket, sockaddr buffer kept alive until completion, port)
+    in_flight = {}
+    free_slots = list(range(window))
+    pending_timeouts = 0
+    open_ports = []
+    port_iter = iter(ports)
+
+    try:
+        while True:
+            # Only take a port when a slot is free; a round that reaped nothing
+            # but link timeouts goes straight back to waiting for completions
+            while free_slots:
+                port = next(port_iter, None)
+                if port is None:
+                    break
+                slot = free_slots.pop()
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_RST)
+                addr = ctypes.create_string_buffer(
+                    struct.pack("=H", socket.AF_INET) + struct.pack("!H", port) + packed_ip, 16
+                )
+                in_flight[slot] = (sock, addr, port)
+                ring.push(IORING_OP_CONNECT, IOSQE_IO_LINK, sock.fileno(), 16,
+                          ctypes.addressof(addr), 0, slot << 1)
+                ring.push(IORING_OP_LINK_TIMEOUT, 0, -1, 0,
+                          ctypes.addressof(timespec), 1, (slot << 1) | 1)
+                pending_timeouts += 1
+
+            if not in_flight and not pending_timeouts:
+                break
+
+            ring.enter(1)
+            for user_data, res in ring.completions():
+                if user_data & 1:
+                    pending_timeouts -= 1
+                    continue
+                slot = user_data >> 1
+                sock, _, port = in_flight.pop(slot)
+                sock.close()
+                free_slots.append(slot)
+                if res == 0:
+                    open_ports.append(port)
+    finally:
+        for sock, _, _ in in_flight.values():
+            sock.close()
+        ring.close()
+
+    return open_ports
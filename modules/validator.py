@@ -4,25 +4,44 @@ Centralized input validation for Offensive Recon Tool
 Ensures safe, correct, and consistent inputs before modules execute
 """
 
+import ipaddress
 import re
-import socket
 import os
 from typing import List, Optional, Tuple, Dict, Union
 from urllib.parse import urlparse
 
+from modules import resolver
+
 
 # =========================
 # Regex Patterns
 # =========================
 
+# Each repetition starts at a literal dot, so a failed match backtracks at most
+# one label at a time; MAX_DOMAIN_LENGTH bounds the input it ever sees
 DOMAIN_REGEX = re.compile(
     r"^(?!-)[A-Za-z0-9-]{1,63}(?<!-)"
-    r"(\.(?!-)[A-Za-z0-9-]{1,63}(?<!-))*\.[A-Za-z]{2,}$"
+    r"(?:\.(?!-)[A-Za-z0-9-]{1,63}(?<!-))*\.[A-Za-z]{2,}$"
 )
 
-IP_REGEX = re.compile(r"^(?:\d{1,3}\.){3}\d{1,3}$")
+# RFC 1035: a full domain name is at most 253 characters in text form
+MAX_DOMAIN_LENGTH = 253
+
+WHOIS_DOMAIN_CHARS_REGEX = re.compile(r"[a-zA-Z0-9.-]+")
+
 
-SAFE_FILENAME_REGEX = re.compile(r"[^a-zA-Z0-9._-]")
+class _FilenameTable(dict):
+    """str.translate table: safe characters map to themselves, anything else to '_'"""
+
+    def __missing__(self, codepoint: int) -> str:
+        # Only unsafe characters get here, once each; the answer is then cached
+        self[codepoint] = "_"
+        return "_"
+
+
+FILENAME_TABLE = _FilenameTable(
+    (ord(c), c) for c in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-"
+)
 
 
 # =========================
@@ -30,13 +49,16 @@ SAFE_FILENAME_REGEX = re.compile(r"[^a-zA-Z0-9._-]")
 # =========================
 
 def is_valid_ip(ip: str) -> bool:
-    if not IP_REGEX.match(ip):
+    # Dotted-quad only: rejects octets above 255, leading zeros and non-ASCII digits
+    try:
+        ipaddress.IPv4Address(ip)
+    except ValueError:
         return False
-    return all(0 <= int(p) <= 255 for p in ip.split("."))
+    return True
 
 
 def is_valid_domain(domain: str) -> bool:
-    return bool(DOMAIN_REGEX.match(domain))
+    return len(domain) <= MAX_DOMAIN_LENGTH and bool(DOMAIN_REGEX.match(domain))
 
 
 def is_url(value: str) -> bool:
@@ -44,10 +66,9 @@ def is_url(value: str) -> bool:
 
 
 def resolve_target(target: str) -> Optional[str]:
-    try:
-        return socket.gethostbyname(target)
-    except socket.gaierror:
-        return None
+    # Goes through the shared resolver cache, so the modules that run
+    # after validation reuse this answer instead of resolving again
+    return resolver.resolve_a(target)
 
 
 # =========================
@@ -90,11 +111,16 @@ def validate_target(
 # =========================
 
 def validate_ports(
-    ports: Optional[Union[List[int], Tuple[int, int]]]
+    ports: Optional[Union[List[int], Tuple[int, int], range]]
 ) -> Dict:
     if ports is None:
         return {"valid": True, "ports": None}
 
+    if isinstance(ports, range):
+        if not ports or ports[0] < 1 or ports[-1] > 65535:
+            return {"valid": False, "error": "Invalid port range"}
+        return {"valid": True, "ports": ports}
+
     if isinstance(ports, tuple):
         start, end = ports
         if start < 1 or end > 65535 or start > end:
@@ -136,7 +162,7 @@ def validate_workers(workers: int) -> Dict:
 # DNS Validation
 # =========================
 
-ALLOWED_DNS_TYPES = {"A", "AAAA", "MX", "NS", "TXT", "SOA", "CNAME"}
+ALLOWED_DNS_TYPES = frozenset({"A", "AAAA", "MX", "NS", "TXT", "SOA", "CNAME"})
 
 def validate_dns_types(types: Optional[List[str]]) -> Dict:
     if not types:
@@ -171,7 +197,7 @@ def validate_whois_domain(domain: str) -> Dict:
     if not check["valid"]:
         return check
 
-    if not re.fullmatch(r"[a-zA-Z0-9.-]+", domain):
+    if not WHOIS_DOMAIN_CHARS_REGEX.fullmatch(domain):
         return {"valid": False, "error": "Invalid characters in domain"}
 
     return {"valid": True, "domain": domain}
@@ -261,12 +287,17 @@ def validate_tech_target(domain: str) -> Dict:
 # =========================
 
 def sanitize_filename(value: str) -> str:
-    value = SAFE_FILENAME_REGEX.sub("_", value)
+    # Every character outside [a-zA-Z0-9._-] becomes '_', in one C-level pass
+    value = value.translate(FILENAME_TABLE)
     return value.strip("_")
 
 
+ALLOWED_REPORT_FORMATS = frozenset({"txt", "html", "text", "json"})
+
 def validate_report_format(fmt: str) -> Dict:
-    if fmt not in ("txt", "html", "text", "json"):
+    if isinstance(fmt, str):
+        fmt = fmt.lower()
+    if fmt not in ALLOWED_REPORT_FORMATS:
         return {"valid": False, "error": "Invalid report format"}
     return {"valid": True, "format": fmt}
 
@@ -298,36 +329,10 @@ def validate_main_inputs(args) -> Dict:
             "error": "Extractor requires crawler module"
         }
 
-    # =========================
-    # Target Validation (mode-based)
-    # =========================
-    if args.crawler:
-        url_check = validate_url_target(args.target)
-        if not url_check["valid"]:
-            return url_check
-
-        depth_check = validate_crawler_depth(args.depth)
-        if not depth_check["valid"]:
-            return depth_check
-
-        katana_check = validate_katana(not args.python_crawler)
-        if not katana_check["valid"]:
-            return katana_check
-
-    elif args.tech_detect:
-        tech_check = validate_tech_target(args.target)
-        if not tech_check["valid"]:
-            return tech_check
-
-    else:
-        needs_domain = args.subdomains or args.dns or args.whois
-        target_check = validate_target(args.target, domain_only=needs_domain)
-        if not target_check["valid"]:
-            return target_check
-
     # =========================
     # Port scan options
     # =========================
+    # Checked before the target, which may need a DNS lookup
     ports_check = validate_ports(args.ports)
     if not ports_check["valid"]:
         return ports_check
@@ -353,6 +358,33 @@ def validate_main_inputs(args) -> Dict:
     if not ns_check["valid"]:
         return ns_check
 
+    # =========================
+    # Target Validation (mode-based)
+    # =========================
+    if args.crawler:
+        depth_check = validate_crawler_depth(args.depth)
+        if not depth_check["valid"]:
+            return depth_check
+
+        url_check = validate_url_target(args.target)
+        if not url_check["valid"]:
+            return url_check
+
+        katana_check = validate_katana(not args.python_crawler)
+        if not katana_check["valid"]:
+            return katana_check
+
+    elif args.tech_detect:
+        tech_check = validate_tech_target(args.target)
+        if not tech_check["valid"]:
+            return tech_check
+
+    else:
+        needs_domain = args.subdomains or args.dns or args.whois
+        target_check = validate_target(args.target, domain_only=needs_domain)
+        if not target_check["valid"]:
+            return target_check
+
     # =========================
     # Output filename
     # =========================
@@ -1,4 +1,118 @@
-import os
+import asyncio
+import socket
+
+WHOIS_PORT = 43
+IANA_SERVER = "whois.iana.org"
+
+# Registry servers for common TLDs; anything else is referred by IANA
+WHOIS_SERVERS = {
+    "com": "whois.verisign-grs.com",
+    "net": "whois.verisign-grs.com",
+    "org": "whois.pir.org",
+    "info": "whois.nic.info",
+    "io": "whois.nic.io",
+    "in": "whois.registry.in",
+    "uk": "whois.nic.uk",
+    "de": "whois.denic.de",
+}
+
+# TLD -> server learned from IANA referrals during this run
+_REFERRALS = {}
+
+
+def _query(server, query, timeout=10):
+    """Send one WHOIS query over TCP/43 and return the full response text"""
+    with socket.create_connection((server, WHOIS_PORT), timeout=timeout) as sock:
+        sock.sendall((query + "\r\n").encode())
+        chunks = []
+        while True:
+            data = sock.recv(4096)
+            if not data:
+                break
+            chunks.append(data)
+    return b"".join(chunks).decode(errors="replace")
+
+
+async def _query_async(server, query, timeout=10):
+    """Event-loop variant of _query"""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(server, WHOIS_PORT), timeout)
+    try:
+        writer.write((query + "\r\n").encode())
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    return data.decode(errors="replace")
+
+
+def _referral(response, *keys):
+    """Return the value of the first 'key: value' line matching one of keys"""
+    for line in response.splitlines():
+        name, sep, value = line.strip().partition(":")
+        if sep and name.lower() in keys and value.strip():
+            return value.strip()
+    return None
+
+
+def _whois_server_for(tld, timeout=10):
+    server = WHOIS_SERVERS.get(tld) or _REFERRALS.get(tld)
+    if server is None:
+        server = _REFERRALS[tld] = _referral(_query(IANA_SERVER, tld, timeout), "refer", "whois")
+    return server
+
+
+def _registrar_server(response, server):
+    """Registrar WHOIS server named in a thin-registry response, if different"""
+    registrar = _referral(response, "registrar whois server")
+    if registrar:
+        registrar = registrar.split("://")[-1].rstrip("/")
+        if registrar.lower() != server:
+            return registrar
+    return None
+
+
+def lookup(domain, timeout=10):
+    """
+    Query WHOIS for a domain directly over TCP, without a whois binary
+
+    Thin registries (.com/.net) only point at the registrar, so one
+    'Registrar WHOIS Server' referral is followed and appended.
+    """
+    domain = domain.strip().lower()
+    server = _whois_server_for(domain.rsplit(".", 1)[-1], timeout)
+    if not server:
+        raise ValueError(f"No WHOIS server found for {domain}")
+
+    response = _query(server, domain, timeout)
+    registrar = _registrar_server(response, server)
+    if registrar:
+        try:
+            response += "\n" + _query(registrar, domain, timeout)
+        except OSError:
+            pass
+    return response
+
+
+async def lookup_async(domain, timeout=10):
+    """Event-loop variant of lookup(), so many domains can be queried at once"""
+    domain = domain.strip().lower()
+    tld = domain.rsplit(".", 1)[-1]
+    server = WHOIS_SERVERS.get(tld) or _REFERRALS.get(tld)
+    if server is None:
+        response = await _query_async(IANA_SERVER, tld, timeout)
+        server = _REFERRALS[tld] = _referral(response, "refer", "whois")
+    if not server:
+        raise ValueError(f"No WHOIS server found for {domain}")
+
+    response = await _query_async(server, domain, timeout)
+    registrar = _registrar_server(response, server)
+    if registrar:
+        try:
+            response += "\n" + await _query_async(registrar, domain, timeout)
+        except (OSError, asyncio.TimeoutError):
+            pass
+    return response
+
 
 def whois_lookup():
     domain = input("Enter website name: ")
@@ -6,4 +120,4 @@ def whois_lookup():
     if "." not in domain:
         print("Error: Please include domain extension like .com, .in, .org")
     else:
-        os.system("whois " + domain)
+        print(lookup(domain))
@@ -0,0 +1,209 @@
+import socket
+import struct
+import threading
+import unittest
+
+import dns.flags
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+from modules.dns import DNSModule
+
+
+def _answer(query_wire, rcode=dns.rcode.NOERROR):
+    """Response to a query: one A record for A questions, empty otherwise"""
+    query = dns.message.from_wire(query_wire)
+    response = dns.message.make_response(query)
+    response.set_rcode(rcode)
+    question = query.question[0]
+    if rcode == dns.rcode.NOERROR and question.rdtype == dns.rdatatype.A:
+        response.answer.append(dns.rrset.from_text(question.name, 300, "IN", "A", "192.0.2.1"))
+    return response.to_wire()
+
+
+class UDPServer:
+    """Local nameserver; drop(query) decides which datagrams go unanswered"""
+
+    def __init__(self, drop=lambda query, count: False):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.settimeout(0.1)
+        self.port = self.sock.getsockname()[1]
+        self.drop = drop
+        self.seen = {}
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while self.running:
+            try:
+                wire, addr = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            query = dns.message.from_wire(wire)
+            key = (query.question[0].name, query.question[0].rdtype)
+            self.seen[key] = self.seen.get(key, 0) + 1
+            if not self.drop(query, self.seen[key]):
+                self.sock.sendto(_answer(wire), addr)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        self.sock.close()
+
+
+def _module(port, timeout=0.3):
+    module = DNSModule(nameserver="127.0.0.1")
+    module.resolver.port = port
+    module.resolver.timeout = timeout
+    module.resolver.lifetime = timeout
+    return module
+
+
+class QueryWireTest(unittest.TestCase):
+
+    def test_queries_parse_back_to_the_question(self):
+        pairs = [("example.com", "A"), ("example.com", "MX"), ("sub.example.org", "TXT")]
+        pending = DNSModule._make_queries(pairs)
+        self.assertEqual(len(pending), 3)
+        for qid, (pair, wire) in pending.items():
+            message = dns.message.from_wire(wire)
+            self.assertEqual(message.id, qid)
+            self.assertTrue(message.flags & dns.flags.RD)
+            self.assertFalse(message.flags & dns.flags.QR)
+            self.assertEqual(len(message.question), 1)
+            question = message.question[0]
+            self.assertEqual(question.name.to_text(omit_final_dot=True), pair[0])
+            self.assertEqual(question.rdtype, dns.rdatatype.from_text(pair[1]))
+            self.assertEqual(message.edns, 0)
+            self.assertEqual(message.payload, DNSModule.EDNS_PAYLOAD)
+
+    def test_type_outside_the_table(self):
+        (_, wire), = DNSModule._make_queries([("example.com", "CAA")]).values()
+        self.assertEqual(dns.message.from_wire(wire).question[0].rdtype, dns.rdatatype.CAA)
+
+    def test_message_ids_are_unique(self):
+        pending = DNSModule._make_queries([(f"h{i}.example.com", "A") for i in range(2000)])
+        self.assertEqual(len(pending), 2000)
+
+    def test_answers_query(self):
+        (pair, wire), = DNSModule._make_queries([("example.com", "A")]).values()
+        response = dns.message.from_wire(_answer(wire))
+        self.assertTrue(DNSModule._answers_query(response, pair))
+        self.assertFalse(DNSModule._answers_query(response, ("example.org", "A")))
+        self.assertFalse(DNSModule._answers_query(response, ("example.com", "AAAA")))
+        # A query echoed back is not a response
+        self.assertFalse(DNSModule._answers_query(dns.message.from_wire(wire), pair))
+
+
+class FromResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.module = _module(53)
+
+    def response(self, domain, rtype, rcode=dns.rcode.NOERROR):
+        (_, wire), = DNSModule._make_queries([(domain, rtype)]).values()
+        return dns.message.from_wire(_answer(wire, rcode))
+
+    def test_records_are_formatted_and_cached(self):
+        results = self.module._from_response("example.com", "A", self.response("example.com", "A"))
+        self.assertEqual(results, ["192.0.2.1"])
+        self.assertEqual(self.module._cache_get(("example.com", "A")), ["192.0.2.1"])
+
+    def test_nxdomain_is_cached_as_empty(self):
+        response = self.response("missing.example", "A", dns.rcode.NXDOMAIN)
+        self.assertEqual(self.module._from_response("missing.example", "A", response), [])
+        self.assertEqual(self.module._cache_get(("missing.example", "A")), [])
+
+    def test_servfail_is_left_to_the_resolver(self):
+        response = self.response("example.com", "A", dns.rcode.SERVFAIL)
+        self.assertIsNone(self.module._from_response("example.com", "A", response))
+
+
+class UDPBatchTest(unittest.TestCase):
+
+    def test_answers_are_matched_to_their_pairs(self):
+        server = UDPServer()
+        self.addCleanup(server.close)
+        pairs = [(f"h{i}.example.com", "A") for i in range(50)]
+        responses = _module(server.port)._udp_batch(pairs)
+        self.assertEqual(set(responses), set(pairs))
+        for (domain, _), response in responses.items():
+            self.assertEqual(response.question[0].name.to_text(omit_final_dot=True), domain)
+
+    def test_lost_queries_are_retransmitted(self):
+        server = UDPServer(drop=lambda query, count: count == 1)
+        self.addCleanup(server.close)
+        responses = _module(server.port, timeout=0.6)._udp_batch([("example.com", "A")])
+        self.assertIsNotNone(responses[("example.com", "A")])
+        self.assertGreaterEqual(max(server.seen.values()), 2)
+
+    def test_unanswered_pairs_map_to_none(self):
+        server = UDPServer(drop=lambda query, count: query.question[0].rdtype == dns.rdatatype.AAAA)
+        self.addCleanup(server.close)
+        responses = _module(server.port)._udp_batch([("example.com", "A"), ("example.com", "AAAA")])
+        self.assertIsNotNone(responses[("example.com", "A")])
+        self.assertIsNone(responses[("example.com", "AAAA")])
+
+    def test_run_does_not_wait_twice_for_a_dropped_type(self):
+        server = UDPServer(drop=lambda query, count: query.question[0].rdtype == dns.rdatatype.AAAA)
+        self.addCleanup(server.close)
+        module = _module(server.port)
+        module.aresolver.port = server.port
+        self.assertEqual(module.run("example.com", ["A", "AAAA"]), {"A": ["192.0.2.1"]})
+
+
+class TCPBatchTest(unittest.TestCase):
+    """Pipelined queries over one connection, answered out of order"""
+
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.addCleanup(self.server.close)
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    @staticmethod
+    def read_exact(conn, size):
+        buf = b""
+        while len(buf) < size:
+            chunk = conn.recv(size - len(buf))
+            if not chunk:
+                raise ConnectionError
+            buf += chunk
+        return buf
+
+    def serve(self):
+        conn, _ = self.server.accept()
+        with conn:
+            queries = []
+            try:
+                while len(queries) < 3:
+                    (length,) = struct.unpack("!H", self.read_exact(conn, 2))
+                    queries.append(self.read_exact(conn, length))
+            except ConnectionError:
+                return
+            for wire in reversed(queries):
+                reply = _answer(wire)
+                conn.sendall(struct.pack("!H", len(reply)) + reply)
+            conn.recv(1)
+
+    def test_replies_in_any_order(self):
+        module = DNSModule(nameserver="127.0.0.1", tcp=True)
+        module.resolver.port = self.server.getsockname()[1]
+        module.resolver.timeout = 2
+        self.addCleanup(module.close)
+        pairs = [("a.example.com", "A"), ("b.example.com", "A"), ("c.example.com", "MX")]
+        responses = module._tcp_batch(pairs)
+        if module._tcp_timer is not None:
+            module._tcp_timer.cancel()
+        self.assertEqual(set(responses), set(pairs))
+        for (domain, rtype), response in responses.items():
+            self.assertTrue(DNSModule._answers_query(response, (domain, rtype)))
+
+
+if __name__ == "__main__":
+    unittest.main()
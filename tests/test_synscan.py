@@ -0,0 +1,60 @@
+import socket
+import struct
+import unittest
+
+from modules import synscan
+
+
+class ChecksumTest(unittest.TestCase):
+
+    def test_rfc1071_example(self):
+        # Worked example from RFC 1071 section 3
+        data = bytes([0x00, 0x01, 0xF2, 0x03, 0xF4, 0xF5, 0xF6, 0xF7])
+        self.assertEqual(synscan._checksum(data), ~0xDDF2 & 0xFFFF)
+
+    def test_odd_length_is_padded(self):
+        self.assertEqual(synscan._checksum(b"\x01"), synscan._checksum(b"\x01\x00"))
+
+
+class SynPacketTest(unittest.TestCase):
+
+    def setUp(self):
+        self.src = socket.inet_aton("192.0.2.1")
+        self.dst = socket.inet_aton("198.51.100.2")
+        self.packet = synscan._syn_packet(self.src, self.dst, 40001, 443, 0x12345678)
+
+    def test_header_fields(self):
+        self.assertEqual(len(self.packet), 20)
+        sport, dport, seq, ack, offset, flags, window, _, urgent = synscan._TCP_HEADER.unpack(self.packet)
+        self.assertEqual((sport, dport, seq, ack), (40001, 443, 0x12345678, 0))
+        self.assertEqual(offset >> 4, 5)
+        self.assertEqual(flags, synscan.TCP_SYN)
+        self.assertEqual(window, 65535)
+        self.assertEqual(urgent, 0)
+
+    def test_checksum_verifies(self):
+        pseudo = synscan._PSEUDO_HEADER.pack(self.src, self.dst, 0, socket.IPPROTO_TCP, len(self.packet))
+        self.assertEqual(synscan._checksum(pseudo + self.packet), 0)
+        self.assertNotEqual(struct.unpack_from("!H", self.packet, 16)[0], 0)
+
+
+@unittest.skipUnless(synscan.available(), "raw sockets need root")
+class LoopbackScanTest(unittest.TestCase):
+
+    def test_open_and_closed_ports(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        self.addCleanup(listener.close)
+        open_port = listener.getsockname()[1]
+
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+        probe.close()
+
+        self.assertEqual(synscan.scan_ports("127.0.0.1", [open_port, closed_port], 1.0, 10), [open_port])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import socket
+import time
+import unittest
+
+from modules import uring
+
+
+def _listener(backlog=8):
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(backlog)
+    return sock
+
+
+def _closed_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+@unittest.skipUnless(uring.available(), "io_uring is not available")
+class UringScanTest(unittest.TestCase):
+
+    def test_open_and_closed_ports(self):
+        listener = _listener()
+        self.addCleanup(listener.close)
+        port = listener.getsockname()[1]
+        self.assertEqual(uring.scan_ports("127.0.0.1", [port, _closed_port()], 0.5, 10), [port])
+
+    def test_more_ports_than_workers(self):
+        listeners = [_listener() for _ in range(25)]
+        for sock in listeners:
+            self.addCleanup(sock.close)
+        ports = [sock.getsockname()[1] for sock in listeners]
+        self.assertEqual(sorted(uring.scan_ports("127.0.0.1", ports, 0.5, 4)), sorted(ports))
+
+    def test_full_backlog_is_not_open(self):
+        # A listener whose accept queue is full drops SYNs; the connect must
+        # time out instead of stalling the ring or being reported open
+        listener = _listener()
+        self.addCleanup(listener.close)
+        full = _listener(backlog=0)
+        self.addCleanup(full.close)
+        for _ in range(3):
+            client = socket.socket()
+            client.setblocking(False)
+            client.connect_ex(full.getsockname())
+            self.addCleanup(client.close)
+        time.sleep(0.2)
+
+        ports = [listener.getsockname()[1], full.getsockname()[1]]
+        self.assertEqual(uring.scan_ports("127.0.0.1", ports, 0.5, 10), [ports[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import socket
+import threading
+import unittest
+from unittest import mock
+
+from modules import whois
+
+
+class ReferralTest(unittest.TestCase):
+
+    def test_first_matching_key_wins(self):
+        response = "domain: IO\nrefer: whois.nic.io\nwhois: whois.other.io\n"
+        self.assertEqual(whois._referral(response, "refer", "whois"), "whois.nic.io")
+
+    def test_key_is_case_insensitive_and_value_stripped(self):
+        response = "   Registrar WHOIS Server:   whois.example-registrar.com  \r\n"
+        self.assertEqual(whois._referral(response, "registrar whois server"),
+                         "whois.example-registrar.com")
+
+    def test_empty_values_are_skipped(self):
+        response = "refer:\nwhois: whois.nic.xyz\n"
+        self.assertEqual(whois._referral(response, "refer", "whois"), "whois.nic.xyz")
+
+    def test_value_may_contain_colons(self):
+        response = "Registrar WHOIS Server: https://whois.example.com/\n"
+        self.assertEqual(whois._referral(response, "registrar whois server"),
+                         "https://whois.example.com/")
+
+    def test_missing_key(self):
+        self.assertIsNone(whois._referral("% no referral here\n", "refer"))
+
+
+class RegistrarServerTest(unittest.TestCase):
+
+    def test_scheme_and_trailing_slash_are_dropped(self):
+        response = "Registrar WHOIS Server: https://whois.example.com/\n"
+        self.assertEqual(whois._registrar_server(response, "whois.verisign-grs.com"),
+                         "whois.example.com")
+
+    def test_same_server_is_not_followed(self):
+        response = "Registrar WHOIS Server: WHOIS.VERISIGN-GRS.COM\n"
+        self.assertIsNone(whois._registrar_server(response, "whois.verisign-grs.com"))
+
+
+class WhoisServerForTest(unittest.TestCase):
+
+    def setUp(self):
+        whois._REFERRALS.clear()
+
+    def tearDown(self):
+        whois._REFERRALS.clear()
+
+    def test_known_tld_needs_no_query(self):
+        with mock.patch.object(whois, "_query", side_effect=AssertionError("queried")):
+            self.assertEqual(whois._whois_server_for("com"), "whois.verisign-grs.com")
+
+    def test_unknown_tld_is_referred_by_iana_once(self):
+        iana = "domain: XYZ\nrefer: whois.nic.xyz\n"
+        with mock.patch.object(whois, "_query", return_value=iana) as query:
+            self.assertEqual(whois._whois_server_for("xyz"), "whois.nic.xyz")
+            self.assertEqual(whois._whois_server_for("xyz"), "whois.nic.xyz")
+        query.assert_called_once_with(whois.IANA_SERVER, "xyz", 10)
+
+    def test_tld_without_referral(self):
+        with mock.patch.object(whois, "_query", return_value="% no match\n"):
+            self.assertIsNone(whois._whois_server_for("invalid"))
+
+
+class QueryTest(unittest.TestCase):
+    """_query against a local TCP/43 stand-in"""
+
+    def setUp(self):
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(1)
+        self.received = []
+        port = self.server.getsockname()[1]
+        patcher = mock.patch.object(whois, "WHOIS_PORT", port)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.server.close)
+
+    def serve(self, reply):
+        def run():
+            conn, _ = self.server.accept()
+            with conn:
+                self.received.append(conn.recv(1024))
+                # Sent in pieces: the client must read until the server closes
+                for i in range(0, len(reply), 7):
+                    conn.sendall(reply[i:i + 7])
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_query_line_and_full_response(self):
+        reply = "Domain Name: EXAMPLE.COM\r\nRegistrar: Example\r\n".encode() * 50
+        thread = self.serve(reply)
+        self.assertEqual(whois._query("127.0.0.1", "example.com", timeout=5), reply.decode())
+        thread.join()
+        self.assertEqual(self.received, [b"example.com\r\n"])
+
+    def test_undecodable_bytes_are_replaced(self):
+        thread = self.serve(b"Registrant: \xff\xfe\n")
+        self.assertEqual(whois._query("127.0.0.1", "example.com", timeout=5),
+                         "Registrant: \ufffd\ufffd\n")
+        thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()